@@ -0,0 +1,304 @@
+# Approximate nearest-neighbour index options for the FAISS vectorstore
+import argparse
+import json
+import math
+import os
+import time
+from typing import Dict, List, Optional
+import faiss
+import numpy as np
+from langchain_community.vectorstores import FAISS
+
+DB_FAISS_PATH = "vectorstore/db_faiss"
+
+INDEX_TYPES = ("flat", "ivf_flat", "ivf_pq", "hnsw")
+
+# Index type and search parameters, saved next to index.faiss
+INDEX_PARAMS_FILE = "index_params.json"
+
+# Below this many vectors a flat index is exact and already fast; IVF-PQ also
+# needs 256 x 39 training points for its codebooks
+MIN_ANN_VECTORS = 10000
+
+DEFAULT_HNSW_M = 32
+DEFAULT_EF_SEARCH = 64
+DEFAULT_NPROBE = 16
+
+
+def default_nlist(n_vectors: int) -> int:
+    """About 4 * sqrt(n) inverted lists, with at least 39 training points each"""
+    return int(max(1, min(4 * math.sqrt(n_vectors), n_vectors // 39)))
+
+
+def default_pq_m(dim: int) -> int:
+    """Sub-quantizers for PQ: 8 dimensions each where possible (48 for MiniLM's 384)"""
+    for m in (dim // 8, 64, 48, 32, 24, 16, 12, 8, 4, 2, 1):
+        if m >= 1 and dim % m == 0:
+            return m
+    return 1
+
+
+def factory_string(index_type: str, dim: int, n_vectors: int, nlist: Optional[int] = None,
+                   pq_m: Optional[int] = None, hnsw_m: int = DEFAULT_HNSW_M) -> str:
+    if index_type == "flat":
+        return "Flat"
+    if index_type == "ivf_flat":
+        return f"IVF{nlist or default_nlist(n_vectors)},Flat"
+    if index_type == "ivf_pq":
+        return f"IVF{nlist or default_nlist(n_vectors)},PQ{pq_m or default_pq_m(dim)}x8"
+    if index_type == "hnsw":
+        return f"HNSW{hnsw_m},Flat"
+    raise ValueError(f"index_type must be one of {INDEX_TYPES}, got '{index_type}'")
+
+
+def effective_index_type(index_type: str, n_vectors: int) -> str:
+    """The type build_index actually builds: small stores stay flat until they reach MIN_ANN_VECTORS"""
+    if index_type != "flat" and n_vectors < MIN_ANN_VECTORS:
+        return "flat"
+    return index_type
+
+
+def apply_search_params(index, params: dict):
+    """Set nprobe (IVF) and efSearch (HNSW) on a loaded index; other keys are ignored"""
+    if params.get("nprobe") is not None:
+        try:
+            faiss.extract_index_ivf(index).nprobe = int(params["nprobe"])
+        except RuntimeError:
+            pass  # not an IVF index
+    if params.get("ef_search") is not None and hasattr(index, "hnsw"):
+        index.hnsw.efSearch = int(params["ef_search"])
+
+
+def build_index(vectors: np.ndarray, index_type: str = "flat", nlist: Optional[int] = None,
+                pq_m: Optional[int] = None, hnsw_m: int = DEFAULT_HNSW_M, nprobe: Optional[int] = None,
+                ef_search: Optional[int] = None, train_size: Optional[int] = None, seed: int = 42):
+    """
+    Build a FAISS index of the given type over vectors (L2, like LangChain's default)
+
+    IVF types are trained on a random sample of train_size vectors (default
+    100 per list). Returns (index, params), where params records the type
+    built, the type asked for (requested_type, so a store that starts out
+    flat is converted once it grows), the factory string and the search
+    parameters for save_index_params.
+    """
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    n_vectors, dim = vectors.shape
+
+    requested_type = index_type
+    index_type = effective_index_type(requested_type, n_vectors)
+    if index_type != requested_type:
+        print(f"Only {n_vectors} vectors, using an exact flat index instead of {requested_type}")
+
+    spec = factory_string(index_type, dim, n_vectors, nlist, pq_m, hnsw_m)
+    index = faiss.index_factory(dim, spec, faiss.METRIC_L2)
+
+    if not index.is_trained:
+        lists = faiss.extract_index_ivf(index).nlist
+        size = min(n_vectors, train_size or max(lists * 100, MIN_ANN_VECTORS))
+        sample = np.random.default_rng(seed).choice(n_vectors, size=size, replace=False)
+        index.train(vectors[np.sort(sample)])
+    index.add(vectors)
+
+    params = {"index_type": index_type, "requested_type": requested_type, "factory": spec}
+    if index_type in ("ivf_flat", "ivf_pq"):
+        params["nprobe"] = nprobe or min(DEFAULT_NPROBE, faiss.extract_index_ivf(index).nlist)
+    if index_type == "hnsw":
+        params["ef_search"] = ef_search or DEFAULT_EF_SEARCH
+    apply_search_params(index, params)
+    return index, params
+
+
+def save_index_params(db_path: str, params: dict):
+    with open(os.path.join(db_path, INDEX_PARAMS_FILE), "w") as f:
+        json.dump(params, f, indent=2)
+
+
+def load_index_params(db_path: str) -> dict:
+    path = os.path.join(db_path, INDEX_PARAMS_FILE)
+    if not os.path.exists(path):
+        return {"index_type": "flat", "factory": "Flat"}
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def load_vectorstore(db_path: str, embedding_model) -> FAISS:
+    """FAISS.load_local plus the saved nprobe/efSearch (they are not part of index.faiss)"""
+    db = FAISS.load_local(
+        folder_path=db_path,
+        embeddings=embedding_model,
+        allow_dangerous_deserialization=True
+    )
+    apply_search_params(db.index, load_index_params(db_path))
+    return db
+
+
+def requested_index_type(params: dict) -> str:
+    """The index type a store was asked to use (older index_params.json files only have index_type)"""
+    return params.get("requested_type", params["index_type"])
+
+
+def supports_remove(index) -> bool:
+    """
+    Whether FAISS.delete can be used on the index as it is
+
+    LangChain's delete expects remove_ids to renumber the remaining vectors
+    and compacts index_to_docstore_id to match. Only IndexFlat does that:
+    IVF keeps the old labels (and later adds collide with them) and HNSW
+    can't drop vectors at all.
+    """
+    return isinstance(index, faiss.IndexFlat)
+
+
+def index_vectors(db: FAISS, embedding_model=None) -> np.ndarray:
+    """
+    All vectors of a vectorstore in index order
+
+    Flat, IVF-Flat and HNSW-Flat store the exact vectors, which are read
+    back. PQ codes are lossy, so those stores are re-embedded from the
+    document texts (cheap with CachedEmbeddings).
+    """
+    index = db.index
+    n_vectors = index.ntotal
+    try:
+        ivf = faiss.extract_index_ivf(index)
+    except RuntimeError:
+        ivf = None
+
+    if ivf is None or not isinstance(faiss.downcast_index(ivf), faiss.IndexIVFPQ):
+        if ivf is not None:
+            ivf.make_direct_map()
+        return index.reconstruct_n(0, n_vectors)
+
+    if embedding_model is None:
+        raise ValueError("A PQ index can't be read back exactly; pass the embedding model to re-embed")
+    texts = [db.docstore.search(db.index_to_docstore_id[i]).page_content for i in range(n_vectors)]
+    return np.asarray(embedding_model.embed_documents(texts), dtype=np.float32)
+
+
+def convert_vectorstore(db: FAISS, index_type: str, embedding_model=None, **options) -> dict:
+    """Replace db.index with a new index of index_type over the same vectors, same order; returns its params"""
+    index, params = build_index(index_vectors(db, embedding_model), index_type, **options)
+    db.index = index
+    return params
+
+
+def _latencies_ms(index, queries: np.ndarray, k: int):
+    """Search one query at a time, the way the bot does; returns (ids, per-query ms)"""
+    ids = np.empty((len(queries), k), dtype=np.int64)
+    latencies = np.empty(len(queries))
+    for i in range(len(queries)):
+        start = time.perf_counter()
+        _, ids[i] = index.search(queries[i:i + 1], k)
+        latencies[i] = (time.perf_counter() - start) * 1000
+    return ids, latencies
+
+
+def recall_latency_report(vectors: np.ndarray, queries: np.ndarray, k: int = 3,
+                          index_types=("ivf_flat", "ivf_pq", "hnsw"),
+                          nprobes=(1, 2, 4, 8, 16, 32, 64), ef_searches=(16, 32, 64, 128, 256),
+                          **options) -> List[Dict]:
+    """
+    Recall@k and per-query latency of each index type against the exact flat index
+
+    Every index is built once and then swept over its search parameter
+    (nprobe for IVF, efSearch for HNSW). Rows are plain dicts, ready for JSON.
+    """
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    queries = np.ascontiguousarray(queries, dtype=np.float32)
+
+    exact = faiss.IndexFlatL2(vectors.shape[1])
+    exact.add(vectors)
+    truth, flat_ms = _latencies_ms(exact, queries, k)
+
+    def row(index_type, factory, param, value, ids, latencies, build_seconds, size):
+        hits = [len(set(found) & set(expected)) for found, expected in zip(ids, truth)]
+        return {
+            "index_type": index_type,
+            "factory": factory,
+            "param": param,
+            "value": value,
+            f"recall_at_{k}": float(np.sum(hits) / truth.size),
+            "p50_ms": float(np.percentile(latencies, 50)),
+            "p99_ms": float(np.percentile(latencies, 99)),
+            "build_seconds": build_seconds,
+            "index_mb": size / (1024 * 1024)
+        }
+
+    rows = [row("flat", "Flat", None, None, truth, flat_ms, 0.0, faiss.serialize_index(exact).nbytes)]
+    for index_type in index_types:
+        start = time.perf_counter()
+        index, params = build_index(vectors, index_type, **options)
+        build_seconds = time.perf_counter() - start
+        if params["index_type"] == "flat":
+            continue  # too few vectors for an ANN index
+
+        size = faiss.serialize_index(index).nbytes
+        param, values = ("ef_search", ef_searches) if index_type == "hnsw" else ("nprobe", nprobes)
+        for value in values:
+            if param == "nprobe" and value > faiss.extract_index_ivf(index).nlist:
+                break
+            apply_search_params(index, {param: value})
+            ids, latencies = _latencies_ms(index, queries, k)
+            rows.append(row(index_type, params["factory"], param, value, ids, latencies, build_seconds, size))
+    return rows
+
+
+def print_report(rows: List[Dict], k: int = 3):
+    print(f"{'index':<10} {'factory':<18} {'param':<14} {'recall@' + str(k):>9} {'p50 ms':>8} {'p99 ms':>8} {'MB':>8}")
+    for r in rows:
+        param = f"{r['param']}={r['value']}" if r["param"] else "-"
+        print(f"{r['index_type']:<10} {r['factory']:<18} {param:<14} {r[f'recall_at_{k}']:>9.3f} "
+              f"{r['p50_ms']:>8.3f} {r['p99_ms']:>8.3f} {r['index_mb']:>8.1f}")
+
+
+if __name__ == "__main__":
+    from cached_embeddings import CachedEmbeddings
+
+    parser = argparse.ArgumentParser(description="Convert the vectorstore index or compare ANN indexes against exact search")
+    parser.add_argument("--db-path", default=DB_FAISS_PATH)
+    parser.add_argument("--index-type", choices=INDEX_TYPES, help="Convert the stored index to this type")
+    parser.add_argument("--nlist", type=int, help="IVF lists (default: ~4*sqrt(n))")
+    parser.add_argument("--pq-m", type=int, help="PQ sub-quantizers (default: dim/8)")
+    parser.add_argument("--hnsw-m", type=int, default=DEFAULT_HNSW_M)
+    parser.add_argument("--nprobe", type=int, help="IVF lists searched per query")
+    parser.add_argument("--ef-search", type=int, help="HNSW search depth")
+    parser.add_argument("--report", action="store_true", help="Write a recall-vs-latency report")
+    parser.add_argument("--queries", help="Text file with one question per line (default: sample stored chunks)")
+    parser.add_argument("--sample-queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=3)
+    args = parser.parse_args()
+
+    embedding_model = CachedEmbeddings()
+    db = load_vectorstore(args.db_path, embedding_model)
+    options = {"nlist": args.nlist, "pq_m": args.pq_m, "hnsw_m": args.hnsw_m}
+    print(f"Loaded {db.index.ntotal} vectors ({load_index_params(args.db_path).get('factory')})")
+
+    if args.report:
+        vectors = index_vectors(db, embedding_model)
+        if args.queries:
+            with open(args.queries, "r") as f:
+                questions = [line.strip() for line in f if line.strip()]
+            queries = np.asarray(embedding_model.embed_documents(questions), dtype=np.float32)
+        else:
+            rng = np.random.default_rng(0)
+            queries = vectors[rng.choice(len(vectors), size=min(args.sample_queries, len(vectors)), replace=False)]
+
+        rows = recall_latency_report(vectors, queries, k=args.k, **options)
+        print_report(rows, args.k)
+        report_path = os.path.join(args.db_path, "ann_report.json")
+        with open(report_path, "w") as f:
+            json.dump({"vectors": len(vectors), "queries": len(queries), "k": args.k, "results": rows}, f, indent=2)
+        print(f"✅ Report saved to: {report_path}")
+
+    if args.index_type:
+        params = convert_vectorstore(db, args.index_type, embedding_model,
+                                     nprobe=args.nprobe, ef_search=args.ef_search, **options)
+        db.save_local(args.db_path)
+        save_index_params(args.db_path, params)
+        print(f"✅ Index converted to {params['factory']}")
+    elif args.nprobe or args.ef_search:
+        # Only the search parameters change; the index itself stays as it is
+        params = load_index_params(args.db_path)
+        params.update({key: value for key, value in (("nprobe", args.nprobe), ("ef_search", args.ef_search)) if value})
+        save_index_params(args.db_path, params)
+        print(f"✅ Search parameters saved: {params}")
@@ -0,0 +1,133 @@
+# Batched embeddings with a persistent on-disk cache and an in-memory LRU for queries
+import hashlib
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from langchain_huggingface import HuggingFaceEmbeddings
+
+EMBEDDING_MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+EMBEDDING_CACHE_PATH = "vectorstore/embedding_cache.sqlite"
+
+# SQLite caps the number of bound parameters per statement
+SQL_BATCH = 500
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Drop-in LangChain embeddings that only run the encoder for unseen text
+
+    Vectors are stored in a SQLite file keyed by a hash of the model name,
+    the normalize flag and the text, so re-ingesting a corpus or restarting
+    the bot reuses everything already encoded. Missing texts are encoded
+    together in batches of batch_size. Queries also go through an LRU kept
+    in memory, so common questions don't touch the disk either.
+    """
+
+    def __init__(self, model_name: str = EMBEDDING_MODEL_NAME, cache_path: Optional[str] = EMBEDDING_CACHE_PATH,
+                 batch_size: int = 256, normalize: bool = True, device: str = "cpu",
+                 num_threads: Optional[int] = None, query_cache_size: int = 1024):
+        if num_threads:
+            import torch
+            torch.set_num_threads(num_threads)
+
+        self.model_name = model_name
+        self.normalize = normalize
+        self.batch_size = batch_size
+        self.encoder = HuggingFaceEmbeddings(
+            model_name=model_name,
+            model_kwargs={"device": device},
+            encode_kwargs={"batch_size": batch_size, "normalize_embeddings": normalize}
+        )
+
+        self.query_cache_size = query_cache_size
+        self._queries: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        self.cache_path = cache_path
+        self._db = None
+        if cache_path:
+            os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+            # Shared by Gradio worker threads; every access holds self._lock
+            self._db = sqlite3.connect(cache_path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB)")
+            self._db.commit()
+
+    def _key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.model_name}|{self.normalize}|{text}".encode("utf-8")).hexdigest()
+
+    def _read(self, keys: List[str]) -> Dict[str, List[float]]:
+        if self._db is None:
+            return {}
+        found = {}
+        with self._lock:
+            for i in range(0, len(keys), SQL_BATCH):
+                batch = keys[i:i + SQL_BATCH]
+                rows = self._db.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(batch))})", batch
+                )
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32).tolist()
+        return found
+
+    def _write(self, items: Dict[str, List[float]]):
+        if self._db is None or not items:
+            return
+        rows = [(key, np.asarray(vector, dtype=np.float32).tobytes()) for key, vector in items.items()]
+        with self._lock:
+            self._db.executemany("INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)", rows)
+            self._db.commit()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Cached vectors where available; every other distinct text is encoded in one batched call"""
+        keys = [self._key(text) for text in texts]
+        vectors = self._read(list(dict.fromkeys(keys)))
+
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in vectors and key not in missing:
+                missing[key] = text
+        with self._lock:
+            self.hits += len(texts) - len(missing)
+            self.misses += len(missing)
+
+        if missing:
+            encoded = self.encoder.embed_documents(list(missing.values()))
+            new_vectors = dict(zip(missing.keys(), encoded))
+            self._write(new_vectors)
+            vectors.update(new_vectors)
+
+        return [vectors[key] for key in keys]
+
+    def embed_query(self, text: str) -> List[float]:
+        """Query vector from the LRU, then the disk cache, then the encoder"""
+        with self._lock:
+            vector = self._queries.get(text)
+            if vector is not None:
+                self._queries.move_to_end(text)
+                self.hits += 1
+                return vector
+
+        vector = self.embed_documents([text])[0]
+
+        with self._lock:
+            self._queries[text] = vector
+            if len(self._queries) > self.query_cache_size:
+                self._queries.popitem(last=False)
+        return vector
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "queries_cached": len(self._queries)}
+
+    def close(self):
+        if self._db is not None:
+            with self._lock:
+                self._db.close()
+                self._db = None
@@ -4,13 +4,14 @@ import speech_recognition as sr
 from deep_translator import GoogleTranslator 
 from gtts import gTTS 
 import pygame
-from langchain_huggingface import HuggingFaceEndpoint, HuggingFaceEmbeddings
+from langchain_huggingface import HuggingFaceEndpoint
 from langchain_core.prompts import PromptTemplate
 from langchain.chains import RetrievalQA
-from langchain_community.vectorstores import FAISS
 from dotenv import load_dotenv
 import sys
 from langchain_community.vectorstores import Chroma
+from cached_embeddings import CachedEmbeddings, EMBEDDING_MODEL_NAME
+from ann_index import load_vectorstore
 
 # Load environment variables
 load_dotenv()
@@ -59,15 +60,8 @@ def set_custom_prompt(custom_prompt_template): # type: ignore
 # Step 3: Load FAISS database
 DB_FAISS_PATH = "vectorstore/db_faiss"
 try:
-    embedding_model = HuggingFaceEmbeddings(
-        model_name="sentence-transformers/all-MiniLM-L6-v2",
-        model_kwargs={"device": "cpu"}
-    )
-    db = FAISS.load_local(
-        folder_path=DB_FAISS_PATH,
-        embeddings=embedding_model,
-        allow_dangerous_deserialization=True
-    )
+    embedding_model = CachedEmbeddings(model_name=EMBEDDING_MODEL_NAME, device="cpu")
+    db = load_vectorstore(DB_FAISS_PATH, embedding_model)
 except Exception as e:
     raise Exception(f"Failed to load FAISS database: {str(e)}")
 
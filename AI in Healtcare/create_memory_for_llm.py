@@ -1,51 +1,228 @@
 # Create memory vectorstore from PDF documents
+import argparse
+import hashlib
+import json
 import os
-from typing import List
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
 from dotenv import load_dotenv, find_dotenv
-from langchain.document_loaders import PyPDFLoader, DirectoryLoader
+from langchain.document_loaders import PyPDFLoader
 from langchain.schema import Document
 from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_huggingface import HuggingFaceEmbeddings
 from langchain_community.vectorstores import FAISS
+from cached_embeddings import CachedEmbeddings, EMBEDDING_MODEL_NAME
+from ann_index import (INDEX_TYPES, convert_vectorstore, effective_index_type, load_index_params,
+                       load_vectorstore, requested_index_type, save_index_params, supports_remove)
 
-def load_pdf_files(data_path: str) -> List[Document]:
-    loader = DirectoryLoader(
-        data_path,
-        glob="*.pdf",
-        loader_cls=lambda path: PyPDFLoader(path)  # Pass a callable that instantiates the loader # type: ignore
-    )
-    documents = loader.load()
-    return documents
+DATA_PATH = "data/"
+DB_FAISS_PATH = "vectorstore/db_faiss"
 
-# Load environment variables from .env file
-load_dotenv(find_dotenv())
+# Content hashes of every ingested file and chunk, saved next to the index
+MANIFEST_FILE = "manifest.json"
+MANIFEST_VERSION = 1
 
-# Ensure the vectorstore directory exists
-os.makedirs("vectorstore", exist_ok=True)
+CHUNK_SIZE = 500
+CHUNK_OVERLAP = 50
 
 # Step 1: Load raw PDF documents from data directory
-DATA_PATH = "data/"
-documents = load_pdf_files(DATA_PATH)
-# print("Loaded PDF documents:", len(documents))
+def list_pdf_files(data_path: str) -> List[str]:
+    return sorted(
+        os.path.join(data_path, name) for name in os.listdir(data_path)
+        if name.lower().endswith(".pdf")
+    )
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def load_pdf_file(path: str) -> List[Document]:
+    return PyPDFLoader(path).load()
 
 # Step 2: Split documents into chunks for embeddings
 def create_chunks(docs: List[Document]) -> List[Document]:
-    text_splitter = RecursiveCharacterTextSplitter(chunk_size=500, chunk_overlap=50)
+    text_splitter = RecursiveCharacterTextSplitter(chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP)
     chunks = text_splitter.split_documents(docs)
     return chunks
 
-text_chunks = create_chunks(documents)
-# print("Text chunks created:", len(text_chunks))
+def chunk_id(source: str, chunk: Document, seen: Dict[str, int]) -> str:
+    """Content hash of a chunk; repeats of the same text on the same page get a counter suffix"""
+    key = f"{source}\n{chunk.metadata.get('page')}\n{chunk.page_content}"
+    digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+    count = seen.get(digest, 0)
+    seen[digest] = count + 1
+    return digest if count == 0 else f"{digest}-{count}"
+
+def parse_pdf(path: str) -> List[Document]:
+    """Load and chunk one PDF (runs in a worker process); each chunk gets a content-hash chunk_id"""
+    chunks = create_chunks(load_pdf_file(path))
+    source = os.path.basename(path)
+    seen: Dict[str, int] = {}
+    for chunk in chunks:
+        chunk.metadata["chunk_id"] = chunk_id(source, chunk, seen)
+    return chunks
+
+def parse_pdfs(paths: List[str], workers: Optional[int] = None) -> Dict[str, List[Document]]:
+    """Parse PDFs in a process pool, returning chunks per path"""
+    if not paths:
+        return {}
+    if workers == 1 or len(paths) == 1:
+        return {path: parse_pdf(path) for path in paths}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return dict(zip(paths, executor.map(parse_pdf, paths)))
 
 # Step 3: Initialize embedding model
-def get_embedding_model() -> HuggingFaceEmbeddings:
-    return HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
+def get_embedding_model(batch_size: int = 256, num_threads: Optional[int] = None) -> CachedEmbeddings:
+    # Chunks embedded by an earlier run (even of a since-deleted index) come from the disk cache
+    return CachedEmbeddings(model_name=EMBEDDING_MODEL_NAME, batch_size=batch_size, num_threads=num_threads)
 
-embedding_model = get_embedding_model()
+# Step 4: Create or update the FAISS vector store
+def load_manifest(db_path: str) -> Optional[dict]:
+    path = os.path.join(db_path, MANIFEST_FILE)
+    if not os.path.exists(path) or not os.path.exists(os.path.join(db_path, "index.faiss")):
+        return None
+    with open(path, "r") as f:
+        manifest = json.load(f)
+    # A different format or embedding model means the stored vectors can't be reused
+    if manifest.get("version") != MANIFEST_VERSION or manifest.get("embedding_model") != EMBEDDING_MODEL_NAME:
+        return None
+    return manifest
 
-# Step 4: Create and save FAISS vector store
-DB_FAISS_PATH = "vectorstore/db_faiss"
-db = FAISS.from_documents(text_chunks, embedding_model)
-db.save_local(DB_FAISS_PATH)
+def save_manifest(db_path: str, files: Dict[str, dict]):
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "embedding_model": EMBEDDING_MODEL_NAME,
+        "chunk_size": CHUNK_SIZE,
+        "chunk_overlap": CHUNK_OVERLAP,
+        "files": files
+    }
+    # Written after the index, and atomically, so it never describes vectors that aren't saved
+    tmp_path = os.path.join(db_path, MANIFEST_FILE + ".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, os.path.join(db_path, MANIFEST_FILE))
+
+def ingest(data_path: str = DATA_PATH, db_path: str = DB_FAISS_PATH, workers: Optional[int] = None,
+           rebuild: bool = False, embedding_model=None, index_type: Optional[str] = None,
+           index_options: Optional[dict] = None) -> dict:
+    """
+    Bring the FAISS store in line with the PDFs in data_path
+
+    Only new or changed files are parsed, and only chunks whose content hash
+    is not in the manifest yet are embedded. Chunks of changed or deleted
+    files that no longer exist are removed from the index.
+
+    index_type picks the FAISS index (see ann_index.py); by default the
+    type the store was asked for is kept, and a store that stayed flat
+    while small is converted once it has enough vectors. index_options
+    (nlist, pq_m, hnsw_m, nprobe, ef_search) apply whenever the index is
+    (re)built.
+    """
+    start = time.time()
+    manifest = None if rebuild else load_manifest(db_path)
+    old_files = manifest["files"] if manifest else {}
+    index_options = {key: value for key, value in (index_options or {}).items() if value is not None}
+    stored_params = load_index_params(db_path) if manifest else {"index_type": "flat", "factory": "Flat"}
+    index_type = index_type or requested_index_type(stored_params)
+
+    # Which files changed, by content hash
+    current = {os.path.basename(path): (path, file_sha256(path)) for path in list_pdf_files(data_path)}
+    changed = [path for name, (path, sha) in current.items() if old_files.get(name, {}).get("sha256") != sha]
+    removed = [name for name in old_files if name not in current]
+
+    parsed = parse_pdfs(changed, workers)
+
+    files = {name: entry for name, entry in old_files.items() if name in current}
+    to_add: List[Document] = []
+    to_delete: List[str] = []
+    for path, chunks in parsed.items():
+        name = os.path.basename(path)
+        old_ids = set(files.get(name, {}).get("chunks", []))
+        new_ids = [chunk.metadata["chunk_id"] for chunk in chunks]
+        to_add.extend(chunk for chunk in chunks if chunk.metadata["chunk_id"] not in old_ids)
+        to_delete.extend(old_ids - set(new_ids))
+        files[name] = {"sha256": current[name][1], "chunks": new_ids}
+    for name in removed:
+        to_delete.extend(old_files[name]["chunks"])
+
+    stats = {
+        "files": len(current),
+        "parsed_files": len(changed),
+        "removed_files": len(removed),
+        "added_chunks": len(to_add),
+        "deleted_chunks": len(to_delete)
+    }
+    n_vectors = sum(len(entry["chunks"]) for entry in files.values())
+    convert = effective_index_type(index_type, n_vectors) != stored_params["index_type"]
+    params = dict(stored_params, requested_type=index_type)
+    if manifest is not None and not to_add and not to_delete and not convert:
+        if params != stored_params:
+            save_index_params(db_path, params)
+        if changed:
+            # New file hashes with the same chunks (e.g. re-saved metadata); record them so they aren't re-parsed
+            save_manifest(db_path, files)
+        stats["seconds"] = time.time() - start
+        return stats
+
+    embedding_model = embedding_model or get_embedding_model()
+    os.makedirs(db_path, exist_ok=True)
+    ids = [chunk.metadata["chunk_id"] for chunk in to_add]
+
+    if manifest is None:
+        if not to_add:
+            raise ValueError(f"No PDF text found in {data_path}")
+        db = FAISS.from_documents(to_add, embedding_model, ids=ids)
+        convert = index_type != "flat"
+    else:
+        db = load_vectorstore(db_path, embedding_model)
+        if to_delete and not supports_remove(db.index):
+            # IVF and HNSW can't delete the way LangChain expects: delete from a flat copy, then rebuild
+            convert_vectorstore(db, "flat", embedding_model)
+            convert = True
+        if to_delete:
+            db.delete(to_delete)
+        if to_add:
+            db.add_documents(to_add, ids=ids)
+
+    if convert:
+        params = convert_vectorstore(db, index_type, embedding_model, **index_options)
+    stats["index"] = params.get("factory", "Flat")
+
+    db.save_local(db_path)
+    save_index_params(db_path, params)
+    save_manifest(db_path, files)
+
+    stats["seconds"] = time.time() - start
+    return stats
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Create or update the FAISS vector store from PDFs")
+    parser.add_argument("--data-path", default=DATA_PATH)
+    parser.add_argument("--db-path", default=DB_FAISS_PATH)
+    parser.add_argument("--workers", type=int, default=None, help="PDF parser processes (default: all cores)")
+    parser.add_argument("--rebuild", action="store_true", help="Ignore the manifest and re-index everything")
+    parser.add_argument("--batch-size", type=int, default=256, help="Chunks per encoder batch")
+    parser.add_argument("--threads", type=int, default=None, help="CPU threads for the encoder (default: torch default)")
+    parser.add_argument("--index-type", choices=INDEX_TYPES, help="FAISS index type (default: keep the stored one, flat for a new store)")
+    parser.add_argument("--nlist", type=int, help="IVF lists (default: ~4*sqrt(n))")
+    parser.add_argument("--pq-m", type=int, help="PQ sub-quantizers (default: dim/8)")
+    parser.add_argument("--hnsw-m", type=int, help="HNSW graph degree")
+    parser.add_argument("--nprobe", type=int, help="IVF lists searched per query")
+    parser.add_argument("--ef-search", type=int, help="HNSW search depth")
+    args = parser.parse_args()
+
+    # Load environment variables from .env file
+    load_dotenv(find_dotenv())
 
-print(f"✅ Vector store saved to: {DB_FAISS_PATH}")
\ No newline at end of file
+    embedding_model = get_embedding_model(args.batch_size, args.threads)
+    index_options = {"nlist": args.nlist, "pq_m": args.pq_m, "hnsw_m": args.hnsw_m,
+                     "nprobe": args.nprobe, "ef_search": args.ef_search}
+    stats = ingest(args.data_path, args.db_path, workers=args.workers, rebuild=args.rebuild,
+                   embedding_model=embedding_model, index_type=args.index_type, index_options=index_options)
+    print(f"Files: {stats['files']} ({stats['parsed_files']} parsed, {stats['removed_files']} removed)")
+    print(f"Chunks: +{stats['added_chunks']} / -{stats['deleted_chunks']} in {stats['seconds']:.1f}s")
+    print(f"Embedding cache: {embedding_model.stats()}")
+    print(f"✅ Vector store saved to: {args.db_path}")
@@ -3,14 +3,20 @@ import speech_recognition as sr
 from deep_translator import GoogleTranslator
 from gtts import gTTS
 from huggingface_hub import InferenceClient
-from langchain_huggingface import HuggingFaceEmbeddings
 from langchain_core.prompts import PromptTemplate
 from langchain_community.vectorstores import FAISS
 from langchain.document_loaders import TextLoader
 from langchain.text_splitter import CharacterTextSplitter
 from dotenv import load_dotenv
+from cached_embeddings import CachedEmbeddings, EMBEDDING_MODEL_NAME
+from ann_index import convert_vectorstore, load_vectorstore, save_index_params
 import gradio as gr
 import tempfile
+import threading
+import time
+import re
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
 load_dotenv()
 
@@ -31,18 +37,26 @@ Answer:"""
 
 DB_FAISS_PATH = "vectorstore/db_faiss"
 DOCUMENT_PATH = "docs/sample.txt"  # Ensure this file exists or update the path
+# flat, ivf_flat, ivf_pq or hnsw (small corpora stay flat, see ann_index.py)
+FAISS_INDEX_TYPE = os.environ.get("FAISS_INDEX_TYPE", "flat")
 
-def build_faiss_db_if_not_exists():
-    if not os.path.exists(os.path.join(DB_FAISS_PATH, "index.faiss")):
-        os.makedirs(DB_FAISS_PATH, exist_ok=True)
+def load_embedding_model():
+    # Repeated questions skip the encoder (in-memory LRU, then the on-disk cache)
+    return CachedEmbeddings(model_name=EMBEDDING_MODEL_NAME, device="cpu")
+
+def build_faiss_db_if_not_exists(embedding_model=None, db_path=DB_FAISS_PATH):
+    if not os.path.exists(os.path.join(db_path, "index.faiss")):
+        os.makedirs(db_path, exist_ok=True)
         loader = TextLoader(DOCUMENT_PATH)
         documents = loader.load()
         text_splitter = CharacterTextSplitter(chunk_size=1000, chunk_overlap=200)
         docs = text_splitter.split_documents(documents)
 
-        embedding_model = HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
+        embedding_model = embedding_model or load_embedding_model()
         db = FAISS.from_documents(docs, embedding_model)
-        db.save_local(DB_FAISS_PATH)
+        params = convert_vectorstore(db, FAISS_INDEX_TYPE, embedding_model)
+        db.save_local(db_path)
+        save_index_params(db_path, params)
         print("FAISS vector store created.")
 
 def load_llm(repo_id):
@@ -51,38 +65,123 @@ def load_llm(repo_id):
     except Exception as e:
         raise Exception(f"LLM load error: {str(e)}")
 
-def load_faiss_db():
+def load_faiss_db(embedding_model=None, db_path=DB_FAISS_PATH):
     try:
-        build_faiss_db_if_not_exists()
-        embedding_model = HuggingFaceEmbeddings(
-            model_name="sentence-transformers/all-MiniLM-L6-v2",
-            model_kwargs={"device": "cpu"}
-        )
-        return FAISS.load_local(
-            folder_path=DB_FAISS_PATH,
-            embeddings=embedding_model,
-            allow_dangerous_deserialization=True
-        )
+        embedding_model = embedding_model or load_embedding_model()
+        build_faiss_db_if_not_exists(embedding_model, db_path)
+        # Applies the saved nprobe/efSearch for ANN indexes
+        return load_vectorstore(db_path, embedding_model)
     except ImportError:
         raise ImportError("FAISS module not installed. Install it with `pip install faiss-cpu` or `faiss-gpu`")
     except Exception as e:
         raise Exception(f"FAISS DB load error: {str(e)}")
 
-def process_query_with_client(client, db, question):
-    try:
-        docs = db.similarity_search(question, k=3)
-        context = " ".join([doc.page_content for doc in docs])
-        prompt = CUSTOM_PROMPT_TEMPLATE.format(context=context, question=question)
-        response = client.chat_completion(
-            messages=[{"role": "user", "content": prompt}],
-            max_tokens=512,
-            temperature=0.5
-        )
-        return {"result": response.choices[0].message.content.strip(), "source_documents": docs}
-    except Exception as e:
-        if "402" in str(e):
-            return {"result": "", "source_documents": []}
-        raise Exception(f"Inference error: {str(e)}")
+class RetrievalRuntime:
+    """
+    Embedding model, FAISS index and LLM client, loaded once per process
+
+    Every Gradio request shares the same instances. The first caller (or
+    warm_up) loads them under a lock; concurrent callers wait for that load
+    instead of starting their own, and later calls return immediately.
+    """
+
+    def __init__(self, db_path=DB_FAISS_PATH, repo_id=HUGGINGFACE_REPO_ID):
+        self.db_path = db_path
+        self.repo_id = repo_id
+        self.embedding_model = None
+        self.db = None
+        self.client = None
+        self.load_seconds = None
+        self.error = None
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+
+    def load(self):
+        """Load everything if it is not loaded yet; returns (client, db)"""
+        if not self._ready.is_set():
+            with self._lock:
+                # Another request may have finished loading while we waited
+                if not self._ready.is_set():
+                    start = time.perf_counter()
+                    try:
+                        embedding_model = load_embedding_model()
+                        db = load_faiss_db(embedding_model, self.db_path)
+                        client = load_llm(self.repo_id)
+                    except Exception as e:
+                        self.error = str(e)
+                        raise
+                    self.embedding_model, self.db, self.client = embedding_model, db, client
+                    self.load_seconds = time.perf_counter() - start
+                    self.error = None
+                    self._ready.set()
+        return self.client, self.db
+
+    def warm_up(self):
+        """Load, then run one search so the encoder and index are paged in before the first user"""
+        _, db = self.load()
+        db.similarity_search("warm up", k=1)
+
+    def warm_up_in_background(self):
+        """Start warm_up on a daemon thread; failures are kept in self.error and retried on first use"""
+        def run():
+            try:
+                self.warm_up()
+                print(f"Retrieval runtime ready in {self.load_seconds:.1f}s")
+            except Exception as e:
+                print(f"Retrieval runtime warm-up failed: {str(e)}")
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        return thread
+
+    def is_ready(self):
+        return self._ready.is_set()
+
+    def wait_until_ready(self, timeout=None):
+        return self._ready.wait(timeout)
+
+    def status(self):
+        if self.is_ready():
+            return f"✅ Ready (loaded in {self.load_seconds:.1f}s)"
+        if self.error:
+            return f"⚠️ Load failed: {self.error}"
+        return "⏳ Loading knowledge base..."
+
+runtime = RetrievalRuntime()
+
+def build_prompt(db, question):
+    docs = db.similarity_search(question, k=3)
+    context = " ".join([doc.page_content for doc in docs])
+    return CUSTOM_PROMPT_TEMPLATE.format(context=context, question=question), docs
+
+def stream_completion(client, prompt):
+    """Yield answer tokens as the model produces them"""
+    stream = client.chat_completion(
+        messages=[{"role": "user", "content": prompt}],
+        max_tokens=512,
+        temperature=0.5,
+        stream=True
+    )
+    for chunk in stream:
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield chunk.choices[0].delta.content
+
+# A sentence ends at . ! ? or the Kannada/Devanagari danda followed by whitespace, or at a line break
+SENTENCE_END = re.compile(r"(?<=[.!?।])\s+|\n+")
+
+def split_sentences(buffer):
+    """Complete sentences in buffer, plus the unfinished tail"""
+    parts = SENTENCE_END.split(buffer)
+    return [part.strip() for part in parts[:-1] if part.strip()], parts[-1]
+
+def speak_sentence(sentence, lang):
+    """Translate (for Kannada) and synthesize one sentence; returns (display text, audio file, error)"""
+    if lang == "kn":
+        sentence, error = translate_to_kannada(sentence)
+        if error:
+            return None, None, error
+    audio_file, error = generate_audio(sentence, lang)
+    return sentence, audio_file, error
 
 def get_voice_input(audio_path, language_code):
     recognizer = sr.Recognizer()
@@ -123,6 +222,14 @@ def generate_audio(text, lang):
         return None, f"Text-to-speech error: {str(e)}"
 
 def process_query(audio, language, text_input=None):
+    """
+    Stream the answer to the UI as it is generated
+
+    Tokens go to the answer box as they arrive. Each finished sentence is
+    handed to a small thread pool for translation and speech synthesis, and
+    the audio segments are yielded in sentence order as soon as they are
+    ready. The first sentence is heard while the rest is still generating.
+    """
     lang_code = "en-US" if language == "English" else "kn-IN"
     lang_short = "en" if language == "English" else "kn"
 
@@ -132,48 +239,76 @@ def process_query(audio, language, text_input=None):
     elif audio:
         text, voice_error = get_voice_input(audio, lang_code)
         if voice_error:
-            return f"Error: {voice_error}", text, None, None, None, None, None
+            yield f"Error: {voice_error}", text, None, None, None, None, None
+            return
     else:
-        return "Error: Provide either audio or text input.", None, None, None, None, None, None
+        yield "Error: Provide either audio or text input.", None, None, None, None, None, None
+        return
 
     query_in_english, trans_error = translate_to_english(text, lang_short)
     if trans_error:
-        return f"Error: {trans_error}", text, None, None, None, None, None
+        yield f"Error: {trans_error}", text, None, None, None, None, None
+        return
+
+    english_query = query_in_english if language == "Kannada" else None
+    english_answer = ""
+    spoken = []
+    errors = []
+    sources_text = None
+
+    def outputs(audio_file=None):
+        # In Kannada mode the answer grows sentence by sentence, as each one is translated
+        answer_to_display = " ".join(spoken) if language == "Kannada" else english_answer
+        kannada_answer = answer_to_display if language == "Kannada" else None
+        error = f"Error: {errors[0]}" if errors else None
+        audio_update = audio_file if audio_file else gr.update()
+        return error, text, english_query, answer_to_display, kannada_answer, audio_update, sources_text
+
+    def ready_segments(pending, wait=False):
+        # Segments are released in sentence order, even if a later one finishes first
+        while pending and (wait or pending[0].done()):
+            sentence, audio_file, error = pending.popleft().result()
+            if error:
+                errors.append(error)
+            # A failed TTS still shows the sentence; only a failed translation has nothing to show
+            if sentence is not None:
+                spoken.append(sentence)
+            yield outputs(audio_file)
 
     try:
-        db = load_faiss_db()
-        client = load_llm(HUGGINGFACE_REPO_ID)
-        response = process_query_with_client(client, db, query_in_english)
-        english_answer = response["result"]
-        sources = response["source_documents"]
+        client, db = runtime.load()
+        prompt, docs = build_prompt(db, query_in_english)
+        sources_text = "\n".join([f"{i+1}. {doc.page_content[:200]}..." for i, doc in enumerate(docs)])
+
+        pending = deque()
+        buffer = ""
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            for token in stream_completion(client, prompt):
+                english_answer += token
+                sentences, buffer = split_sentences(buffer + token)
+                for sentence in sentences:
+                    pending.append(executor.submit(speak_sentence, sentence, lang_short))
+                yield outputs()
+                yield from ready_segments(pending)
+
+            if buffer.strip():
+                pending.append(executor.submit(speak_sentence, buffer.strip(), lang_short))
+            yield from ready_segments(pending, wait=True)
 
         if not english_answer:
-            return "Error: No response from model (maybe credit limit).", text, query_in_english, None, None, None, None
-
-        if language == "Kannada":
-            kannada_answer, kan_err = translate_to_kannada(english_answer)
-            if kan_err:
-                return f"Error: {kan_err}", text, query_in_english, english_answer, None, None, None
-            answer_to_display = kannada_answer
-            answer_to_speak = kannada_answer
-        else:
-            answer_to_display = english_answer
-            kannada_answer = None
-            answer_to_speak = english_answer
-
-        audio_file, audio_err = generate_audio(answer_to_speak, lang_short)
-        if audio_err:
-            return f"Error: {audio_err}", text, query_in_english, answer_to_display, kannada_answer, None, None
-
-        sources_text = "\n".join([f"{i+1}. {doc.page_content[:200]}..." for i, doc in enumerate(sources)])
-
-        return None, text, query_in_english if language == "Kannada" else None, answer_to_display, kannada_answer, audio_file, sources_text
+            yield "Error: No response from model (maybe credit limit).", text, query_in_english, None, None, None, None
+            return
+        yield outputs()
     except Exception as e:
-        return f"Error: {str(e)}", text, query_in_english, None, None, None, None
+        if "402" in str(e):
+            yield "Error: No response from model (maybe credit limit).", text, query_in_english, None, None, None, None
+            return
+        yield f"Error: {str(e)}", text, query_in_english, english_answer or None, None, None, sources_text
 
 with gr.Blocks() as demo:
     with gr.Column():
         gr.Markdown("## 🩺 Bilingual Medical QA Chatbot")
+        runtime_status = gr.Markdown(runtime.status())
 
         with gr.Row():
             language = gr.Dropdown(["English", "Kannada"], label="Language", value="English")
@@ -189,7 +324,8 @@ with gr.Blocks() as demo:
         answer = gr.Textbox(label="Answer")
         kannada_answer = gr.Textbox(label="Answer (Kannada)", visible=False)
         sources_output = gr.Textbox(label="Source Documents")
-        audio_output = gr.Audio(label="🔊 Audio Response")
+        # Sentence-by-sentence audio segments play as they arrive
+        audio_output = gr.Audio(label="🔊 Audio Response", streaming=True, autoplay=True)
 
         submit_button.click(
             fn=process_query,
@@ -197,4 +333,10 @@ with gr.Blocks() as demo:
             outputs=[error_output, original_query, english_query, answer, kannada_answer, audio_output, sources_output]
         )
 
+    # Readiness shown on page load
+    demo.load(fn=runtime.status, outputs=runtime_status)
+
+# Load the models while the server starts, not on the first question
+runtime.warm_up_in_background()
+demo.queue(default_concurrency_limit=int(os.environ.get("MEDIBOT_CONCURRENCY", 4)))
 demo.launch()
\ No newline at end of file
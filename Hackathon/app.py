@@ -4,12 +4,14 @@ import plotly.express as px
 import plotly.graph_objects as go
 # Wrap import to handle case where predict.py exists but dependencies aren't installed yet
 try:
-    from predict import TransactionPredictor
+    from predict import TransactionPredictor, iter_transaction_chunks
+    from batch_jobs import BatchJobRunner
 except ImportError:
     TransactionPredictor = None
 import yaml
 import json
 import os
+import tempfile
 
 # Page config
 st.set_page_config(
@@ -47,10 +49,17 @@ st.markdown("""
 
 @st.cache_resource
 def load_predictor():
-    """Load the predictor (cached for performance)"""
+    """Load the predictor once; it hot-reloads taxonomy.yaml and models/ in the background"""
     if TransactionPredictor is None:
         return None
-    return TransactionPredictor()
+    predictor = TransactionPredictor()
+    predictor.start_watching()
+    return predictor
+
+@st.cache_resource
+def load_job_runner():
+    """Background batch jobs outlive reruns and page switches; each session tracks its own job ids"""
+    return BatchJobRunner(load_predictor())
 
 def main():
     st.markdown('<div class="main-header">💳 AI Transaction Categorizer</div>', unsafe_allow_html=True)
@@ -161,8 +170,14 @@ def show_single_prediction(predictor):
     
     if predict_btn and transaction:
         with st.spinner("Analyzing transaction..."):
-            result = predictor.predict(transaction, explain=explain_mode)
-        
+            st.session_state['single_result'] = predictor.predict(transaction, explain=explain_mode)
+    
+    # Kept in session state so the result survives the rerun of a correction submit
+    result = st.session_state.get('single_result')
+    correction_message = st.session_state.pop('correction_message', None)
+    if correction_message:
+        st.success(correction_message)
+    if result:
         # Display results
         st.markdown("---")
         
@@ -178,15 +193,38 @@ def show_single_prediction(predictor):
             st.markdown(f'<span class="{confidence_class}">{confidence_pct}</span>', unsafe_allow_html=True)
         
         with col3:
-            method_emoji = "📏" if result['method'] == 'rule_match' else "🤖"
+            method_emoji = {'rule_match': "📏", 'feedback': "🧑‍⚖️"}.get(result['method'], "🤖")
             st.metric("Method", f"{method_emoji} {result['method'].replace('_', ' ').title()}")
         
         # Additional details
         if result['method'] == 'rule_match':
             st.success(f"✓ Matched keyword: **{result.get('matched_keyword', 'N/A')}**")
         
+        if result['method'] == 'feedback':
+            st.success("✓ Category set by an earlier reviewer correction")
+        
         if result['needs_review']:
             st.warning("⚠️ Low confidence - recommend manual review")
+            
+            # Feedback loop: the correction applies immediately, no retraining
+            with st.form("correction_form"):
+                categories = list(predictor.categories)
+                corrected = st.selectbox(
+                    "Correct category:",
+                    categories,
+                    index=categories.index(result['category']) if result['category'] in categories else 0
+                )
+                if st.form_submit_button("✅ Submit Correction"):
+                    update = predictor.record_feedback(result['original_text'], corrected, result)
+                    st.session_state['correction_message'] = (
+                        f"✓ Learned '{corrected}' in {update['elapsed_ms']:.1f}ms "
+                        f"({update['model_steps']} model update steps)"
+                    )
+                    # Show the corrected prediction instead of the stale one
+                    st.session_state['single_result'] = predictor.predict(
+                        result['original_text'], explain=explain_mode
+                    )
+                    st.rerun()
         
         # Explanation
         if explain_mode and 'explanation' in result and 'top_words' in result['explanation']:
@@ -225,68 +263,47 @@ def show_batch_processing(predictor):
     
     # File upload
     uploaded_file = st.file_uploader(
-        "Upload CSV file with transactions",
-        type=['csv'],
-        help="CSV should have a 'description' column"
+        "Upload CSV or Parquet file with transactions",
+        type=['csv', 'parquet'],
+        help="File should have a 'description' column"
     )
     
     if uploaded_file is not None:
-        df = pd.read_csv(uploaded_file)
+        # Only a preview is loaded here; the full file is streamed in chunks
+        try:
+            preview_df = next(iter_transaction_chunks(uploaded_file, chunk_size=10))
+        except ValueError as e:
+            st.error(f"❌ {e}")
+            uploaded_file = None
+    
+    if uploaded_file is not None:
+        uploaded_file.seek(0)
         
-        st.success(f"✓ Loaded {len(df)} transactions")
-        st.dataframe(df.head(10), use_container_width=True)
+        st.success(f"✓ Uploaded {uploaded_file.name}")
+        st.dataframe(preview_df, use_container_width=True)
         
-        if 'description' not in df.columns:
-            st.error("❌ CSV must have a 'description' column")
-            return
+        col1, col2 = st.columns(2)
+        output_format = col1.radio("Results format", ["CSV", "Parquet"], horizontal=True)
+        description_only = col2.checkbox(
+            "Read only the description column", value=False,
+            help="Skips decoding the other input columns; results keep just description + predictions"
+        )
         
         if st.button("🚀 Process All Transactions", type="primary"):
-            with st.spinner("Processing transactions..."):
-                results = predictor.batch_predict(df, show_progress=False)
-                
-                # Create results DataFrame
-                results_df = pd.DataFrame(results)
-                
-                # Statistics
-                stats = predictor.get_statistics(results)
-                
-                st.markdown("---")
-                st.subheader("📈 Processing Statistics")
-                
-                col1, col2, col3, col4 = st.columns(4)
-                col1.metric("Total Processed", stats['total_predictions'])
-                col2.metric("Rule Matches", stats['rule_matches'])
-                col3.metric("ML Predictions", stats['ml_predictions'])
-                col4.metric("Needs Review", stats['needs_review'])
-                
-                # Average confidence
-                st.metric("Average Confidence", f"{stats['avg_confidence']*100:.1f}%")
-                
-                # Category distribution
-                st.subheader("📊 Category Distribution")
-                cat_dist = pd.DataFrame([
-                    {"Category": cat, "Count": count}
-                    for cat, count in stats['category_distribution'].items()
-                ])
-                
-                fig = px.pie(cat_dist, values='Count', names='Category', 
-                            title='Transaction Distribution by Category')
-                st.plotly_chart(fig, use_container_width=True)
-                
-                # Low confidence samples
-                if stats['needs_review'] > 0:
-                    st.subheader("⚠️ Low Confidence Predictions (Need Review)")
-                    low_conf_df = pd.DataFrame(stats['low_confidence_samples'])
-                    st.dataframe(low_conf_df, use_container_width=True)
-                
-                # Download results
-                results_csv = results_df.to_csv(index=False).encode('utf-8')
-                st.download_button(
-                    label="📥 Download Results CSV",
-                    data=results_csv,
-                    file_name="categorized_transactions.csv",
-                    mime="text/csv"
-                )
+            # The upload is copied to disk so the job does not depend on this script run
+            with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(uploaded_file.name)[1]) as tmp_file:
+                tmp_file.write(uploaded_file.getvalue())
+                input_path = tmp_file.name
+            suffix = ".parquet" if output_format == "Parquet" else ".csv"
+            with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp_file:
+                results_path = tmp_file.name
+            
+            job = load_job_runner().submit(
+                uploaded_file.name, input_path, results_path,
+                columns=['description'] if description_only else None,
+                delete_input=True
+            )
+            st.session_state.setdefault('batch_job_ids', []).append(job.id)
     else:
         # Show sample data option
         if st.button("📄 Load Sample Data"):
@@ -295,6 +312,93 @@ def show_batch_processing(predictor):
                     st.download_button("Download Sample CSV", f, "sample.csv", "text/csv")
             else:
                 st.warning("Sample data not found. Run `python train.py` first to generate it.")
+    
+    job_ids = st.session_state.get('batch_job_ids', [])
+    if job_ids:
+        runner = load_job_runner()
+        # Only poll while something is still running
+        refresh = 1.0 if any(job.active for job in runner.jobs(job_ids)) else None
+        st.fragment(run_every=refresh)(show_batch_jobs)(runner, job_ids)
+
+def show_batch_jobs(runner, job_ids):
+    """Background batch jobs of this session; re-run every second while one is active"""
+    jobs = runner.jobs(job_ids)
+    
+    st.markdown("---")
+    st.subheader("🗂️ Batch Jobs")
+    
+    for job in reversed(jobs):
+        with st.container(border=True):
+            col1, col2 = st.columns([4, 1])
+            col1.markdown(f"**{job.name}** · job `{job.id}` · {job.status}")
+            
+            if job.active:
+                col2.button("⏹️ Cancel", key=f"cancel_{job.id}", on_click=runner.cancel, args=(job.id,))
+                total = f"/{job.total_rows}" if job.total_rows else ""
+                throughput = job.progress['throughput'] if job.progress else 0
+                st.progress(job.fraction, text=f"{job.processed}{total} transactions · {throughput:.0f} txn/s")
+                continue
+            
+            if col2.button("🗑️ Remove", key=f"remove_{job.id}"):
+                runner.remove(job.id)
+                st.session_state['batch_job_ids'] = [i for i in job_ids if i != job.id]
+                st.rerun()
+            
+            if job.status == 'failed':
+                st.error(f"❌ {job.error}")
+            elif job.stats:
+                if job.status == 'cancelled':
+                    st.warning(f"⚠️ Cancelled after {job.processed} transactions; partial results below")
+                show_batch_results(job)
+    
+    # A job finished since the last refresh: rerun the page once so polling stops
+    if st.session_state.get('batch_jobs_active') and not any(job.active for job in jobs):
+        st.session_state['batch_jobs_active'] = False
+        st.rerun()
+    st.session_state['batch_jobs_active'] = any(job.active for job in jobs)
+
+def show_batch_results(job):
+    """Statistics, charts and download for a finished batch job"""
+    stats = job.stats
+    
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Total Processed", stats['total_predictions'])
+    col2.metric("Rule Matches", stats['rule_matches'])
+    col3.metric("ML Predictions", stats['ml_predictions'])
+    col4.metric("Needs Review", stats['needs_review'])
+    
+    # Average confidence and throughput
+    col1, col2 = st.columns(2)
+    col1.metric("Average Confidence", f"{stats['avg_confidence']*100:.1f}%")
+    col2.metric("Throughput", f"{stats['throughput']:.0f} txn/s")
+    
+    # Category distribution
+    if stats['category_distribution']:
+        cat_dist = pd.DataFrame([
+            {"Category": cat, "Count": count}
+            for cat, count in stats['category_distribution'].items()
+        ])
+        
+        fig = px.pie(cat_dist, values='Count', names='Category', 
+                    title='Transaction Distribution by Category')
+        st.plotly_chart(fig, use_container_width=True, key=f"distribution_{job.id}")
+    
+    # Low confidence samples
+    if stats['needs_review'] > 0:
+        st.markdown("**⚠️ Low Confidence Predictions (Need Review)**")
+        st.dataframe(pd.DataFrame(stats['low_confidence_samples']), use_container_width=True)
+    
+    # Download results straight from the streamed output file
+    suffix = os.path.splitext(job.output_path)[1]
+    if os.path.exists(job.output_path):
+        with open(job.output_path, 'rb') as f:
+            st.download_button(
+                label=f"📥 Download Results {suffix[1:].upper()}",
+                data=f,
+                file_name=f"categorized_transactions{suffix}",
+                mime="text/csv" if suffix == ".csv" else "application/octet-stream",
+                key=f"download_{job.id}"
+            )
 
 def show_taxonomy_editor():
     """Edit category taxonomy"""
@@ -309,7 +413,7 @@ def show_taxonomy_editor():
     with open(yaml_path, 'r') as f:
         config = yaml.safe_load(f)
     
-    st.info("💡 Edit categories below. Changes require restarting the app to take effect.")
+    st.info("💡 Edit categories below. Saved changes are picked up automatically within a few seconds.")
     
     # Display current categories
     st.markdown("### Current Categories")
@@ -334,7 +438,7 @@ def show_taxonomy_editor():
                 new_config = yaml.safe_load(edited_yaml)
                 with open(yaml_path, 'w') as f:
                     yaml.dump(new_config, f, default_flow_style=False, sort_keys=False)
-                st.success("✓ Configuration saved! Restart the app to apply changes.")
+                st.success("✓ Configuration saved! The rule engine will reload it automatically.")
             except Exception as e:
                 st.error(f"❌ Invalid YAML: {str(e)}")
     
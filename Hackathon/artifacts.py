@@ -0,0 +1,152 @@
+import hashlib
+import json
+import os
+import pickle
+from datetime import datetime
+
+import joblib
+import sklearn
+
+# Bump when the artifact layout changes in a way older loaders can't read
+ARTIFACT_VERSION = 1
+MANIFEST_FILE = 'manifest.json'
+
+ARTIFACT_FILES = {
+    'model': 'model.joblib',
+    'vectorizer': 'vectorizer.joblib',
+    'categories': 'categories.json'
+}
+
+# Pre-manifest layout, still loadable
+LEGACY_FILES = {
+    'model': 'model.pkl',
+    'vectorizer': 'vectorizer.pkl',
+    'categories': 'categories.pkl'
+}
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def save_artifacts(path, model, vectorizer, categories, extra=None):
+    """
+    Save model components as memory-mappable joblib files plus a manifest
+
+    The joblib files are written uncompressed so their numpy arrays can be
+    memory-mapped on load. Every file is written under a temporary name and
+    moved into place with os.replace: processes that mapped the previous
+    files keep reading the old inodes instead of pages being rewritten
+    under them. manifest.json is replaced last, so a directory's manifest
+    always describes a complete set of files.
+    """
+    os.makedirs(path, exist_ok=True)
+
+    tmp_paths = {name: os.path.join(path, filename + '.tmp') for name, filename in ARTIFACT_FILES.items()}
+    joblib.dump(model, tmp_paths['model'])
+    joblib.dump(vectorizer, tmp_paths['vectorizer'])
+    with open(tmp_paths['categories'], 'w') as f:
+        json.dump([str(cat) for cat in categories], f, indent=2)
+
+    manifest = {
+        'version': ARTIFACT_VERSION,
+        'created': datetime.now().isoformat(),
+        'sklearn_version': sklearn.__version__,
+        'model_type': type(model).__name__,
+        'vectorizer_type': type(vectorizer).__name__,
+        'categories': [str(cat) for cat in categories],
+        'files': {}
+    }
+    for name, filename in ARTIFACT_FILES.items():
+        manifest['files'][name] = {
+            'file': filename,
+            'bytes': os.path.getsize(tmp_paths[name]),
+            'sha256': _sha256(tmp_paths[name])
+        }
+    for name, filename in ARTIFACT_FILES.items():
+        os.replace(tmp_paths[name], os.path.join(path, filename))
+    if extra:
+        manifest.update(extra)
+
+    tmp_path = os.path.join(path, MANIFEST_FILE + '.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, os.path.join(path, MANIFEST_FILE))
+
+    return manifest
+
+
+def read_manifest(path):
+    """Return the manifest dict, or None for a legacy pickle directory"""
+    manifest_path = os.path.join(path, MANIFEST_FILE)
+    if not os.path.exists(manifest_path):
+        return None
+    with open(manifest_path, 'r') as f:
+        return json.load(f)
+
+
+def watch_paths(path):
+    """
+    Files whose change means a new model was saved to path
+
+    save_artifacts replaces manifest.json last, so in the manifest layout
+    it is the only file to watch. Legacy directories watch the pickles.
+    """
+    manifest_path = os.path.join(path, MANIFEST_FILE)
+    if os.path.exists(manifest_path):
+        return [manifest_path]
+    return [os.path.join(path, filename) for filename in LEGACY_FILES.values()]
+
+
+def verify_artifacts(path, manifest):
+    """True if every file listed in manifest exists with the recorded size and sha256"""
+    for entry in manifest['files'].values():
+        file_path = os.path.join(path, entry['file'])
+        if not os.path.exists(file_path) or os.path.getsize(file_path) != entry['bytes']:
+            return False
+        if _sha256(file_path) != entry['sha256']:
+            return False
+    return True
+
+
+def load_artifacts(path, mmap_mode='r'):
+    """
+    Load (model, vectorizer, categories, manifest) from path
+
+    With mmap_mode='r' plain numpy attributes (LogisticRegression coef_,
+    the TF-IDF idf_) are memory-mapped read-only, so processes loading the
+    same files share those pages through the OS page cache. Decision trees
+    are not: sklearn's Tree.__setstate__ copies the node and value arrays
+    into private memory, so every process holds its own copy of a
+    RandomForest. Serve a linear model (train.py --compact) when workers
+    should share the model. Directories without a manifest fall back to
+    the pickles.
+    """
+    manifest = read_manifest(path)
+
+    if manifest is None:
+        with open(os.path.join(path, LEGACY_FILES['model']), 'rb') as f:
+            model = pickle.load(f)
+        with open(os.path.join(path, LEGACY_FILES['vectorizer']), 'rb') as f:
+            vectorizer = pickle.load(f)
+        with open(os.path.join(path, LEGACY_FILES['categories']), 'rb') as f:
+            categories = pickle.load(f)
+        return model, vectorizer, categories, None
+
+    if manifest.get('version', 0) > ARTIFACT_VERSION:
+        raise ValueError(
+            f"Artifacts in {path} use format version {manifest['version']}, "
+            f"this code supports up to {ARTIFACT_VERSION}"
+        )
+
+    files = manifest['files']
+    model = joblib.load(os.path.join(path, files['model']['file']), mmap_mode=mmap_mode)
+    vectorizer = joblib.load(os.path.join(path, files['vectorizer']['file']), mmap_mode=mmap_mode)
+    with open(os.path.join(path, files['categories']['file']), 'r') as f:
+        categories = json.load(f)
+
+    return model, vectorizer, categories, manifest
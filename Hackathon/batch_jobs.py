@@ -0,0 +1,163 @@
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from predict import count_transactions
+
+
+class BatchJob:
+    """One background stream_predict run: status, live progress and the finished statistics"""
+
+    def __init__(self, name, input_path, output_path, columns=None, delete_input=False):
+        self.id = uuid.uuid4().hex[:8]
+        self.name = name
+        self.input_path = input_path
+        self.output_path = output_path
+        self.columns = columns
+        self.delete_input = delete_input
+        self.status = 'queued'
+        self.created = time.time()
+        self.finished = None
+        self.total_rows = None
+        self.progress = None
+        self.stats = None
+        self.error = None
+        self.future = None
+        self.cancel_event = threading.Event()
+
+    @property
+    def processed(self):
+        return self.progress['total_predictions'] if self.progress else 0
+
+    @property
+    def fraction(self):
+        """Share of the input scored so far, 0-1 (0 while the row count is unknown)"""
+        if not self.total_rows:
+            return 1.0 if self.status == 'done' else 0.0
+        return min(self.processed / self.total_rows, 1.0)
+
+    @property
+    def active(self):
+        return self.status in ('queued', 'running')
+
+
+class BatchJobRunner:
+    """
+    Run batch jobs on a background thread so the caller never blocks
+
+    Jobs are scored one at a time on a single worker (the predictor is
+    shared), with progress reported per chunk. Finished jobs keep their
+    statistics and output file so callers can look them up by id again
+    later, until they are removed or pruned: at most max_finished of them
+    are kept, none older than max_age seconds, so abandoned sessions
+    don't fill the disk.
+    """
+
+    def __init__(self, predictor, chunk_size=50000, max_workers=1, max_finished=20, max_age=24 * 3600):
+        self.predictor = predictor
+        self.chunk_size = chunk_size
+        self.max_finished = max_finished
+        self.max_age = max_age
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, name, input_path, output_path, columns=None, delete_input=False):
+        """
+        Queue input_path for scoring into output_path and return the job
+
+        With delete_input the input file belongs to the job and is deleted
+        as soon as the job finishes (for uploads copied to a temp file).
+        """
+        self.prune()
+        job = BatchJob(name, input_path, output_path, columns, delete_input)
+        with self._lock:
+            self._jobs[job.id] = job
+        job.future = self._executor.submit(self._run, job)
+        return job
+
+    def _run(self, job):
+        try:
+            self._score(job)
+        finally:
+            job.finished = time.time()
+            if job.delete_input:
+                _delete_file(job.input_path)
+
+    def _score(self, job):
+        if job.cancel_event.is_set():
+            job.status = 'cancelled'
+            return
+
+        job.status = 'running'
+        try:
+            job.total_rows = count_transactions(job.input_path)
+
+            def on_progress(stats):
+                job.progress = stats
+
+            job.stats = self.predictor.stream_predict(
+                job.input_path, job.output_path, chunk_size=self.chunk_size, show_progress=False,
+                columns=job.columns, progress_callback=on_progress, cancel_event=job.cancel_event
+            )
+            job.progress = job.stats
+            job.status = 'cancelled' if job.stats['cancelled'] else 'done'
+        except Exception as e:
+            job.error = str(e)
+            job.status = 'failed'
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def jobs(self, job_ids=None):
+        """Jobs in submission order, optionally only the given ids"""
+        self.prune()
+        with self._lock:
+            jobs = list(self._jobs.values())
+        if job_ids is not None:
+            jobs = [job for job in jobs if job.id in job_ids]
+        return sorted(jobs, key=lambda job: job.created)
+
+    def cancel(self, job_id):
+        """Ask a job to stop after its current chunk (rows scored so far are kept)"""
+        job = self.get(job_id)
+        if job is not None:
+            job.cancel_event.set()
+        return job
+
+    def remove(self, job_id):
+        """Forget a finished job and delete its input and output files"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.active:
+                return False
+            del self._jobs[job_id]
+
+        _delete_file(job.input_path)
+        _delete_file(job.output_path)
+        return True
+
+    def prune(self):
+        """Remove finished jobs older than max_age and all but the newest max_finished; returns how many"""
+        now = time.time()
+        with self._lock:
+            finished = sorted(
+                (job for job in self._jobs.values() if job.finished is not None and not job.active),
+                key=lambda job: job.finished, reverse=True
+            )
+        expired = [
+            job for rank, job in enumerate(finished)
+            if rank >= self.max_finished or now - job.finished > self.max_age
+        ]
+        return sum(self.remove(job.id) for job in expired)
+
+
+def _delete_file(path):
+    try:
+        if path:
+            os.remove(path)
+    except FileNotFoundError:
+        pass
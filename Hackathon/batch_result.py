@@ -0,0 +1,177 @@
+import json
+from collections.abc import Sequence
+from enum import IntEnum
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+
+class Method(IntEnum):
+    """How a transaction was categorized, stored as one int8 per row"""
+    RULE_MATCH = 0
+    ML_MODEL = 1
+    FEEDBACK = 2
+
+    @property
+    def label(self):
+        return self.name.lower()
+
+
+METHOD_LABELS = np.array([method.label for method in Method], dtype=object)
+
+
+def _py_float(value):
+    """float32 -> Python float without float64 noise (0.95, not 0.949999988079071)"""
+    return float(str(value))
+
+
+class BatchResult(Sequence):
+    """
+    Columnar predictions for a batch of transactions
+
+    Every column is one NumPy array: category codes into `categories`,
+    float32 confidence, int8 Method codes, keyword codes into `keywords`
+    (-1 for none), the needs_review flags and a float32 probability matrix
+    (NaN rows where no model ran). Indexing or iterating renders the usual
+    prediction dicts lazily, one row at a time; to_dataframe and to_arrow
+    convert the whole batch at once.
+    """
+
+    def __init__(self, categories, category_codes, confidence, method_codes, keywords, keyword_codes,
+                 needs_review, original_text, probabilities=None, probability_columns=None,
+                 explanations=None, explanation_codes=None):
+        self.categories = np.asarray(categories, dtype=object)
+        self.category_codes = category_codes
+        self.confidence = confidence
+        self.method_codes = method_codes
+        self.keywords = np.asarray(keywords, dtype=object)
+        self.keyword_codes = keyword_codes
+        self.needs_review = needs_review
+        self.original_text = original_text
+        self.probabilities = probabilities
+        self.probability_columns = list(probability_columns or [])
+        # Explanations are kept per distinct description, explanation_codes maps rows to them
+        self.explanations = explanations or {}
+        self.explanation_codes = explanation_codes
+
+    def __len__(self):
+        return len(self.category_codes)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return BatchResult(
+                self.categories, self.category_codes[index], self.confidence[index], self.method_codes[index],
+                self.keywords, self.keyword_codes[index], self.needs_review[index],
+                self.original_text[index],
+                None if self.probabilities is None else self.probabilities[index],
+                self.probability_columns, self.explanations,
+                None if self.explanation_codes is None else self.explanation_codes[index]
+            )
+
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("BatchResult index out of range")
+        return self._row(index)
+
+    def __repr__(self):
+        return f"BatchResult({len(self)} predictions)"
+
+    def _row(self, i):
+        """Render row i in the single-prediction dict format"""
+        method = Method(self.method_codes[i])
+        result = {
+            'category': self.categories[self.category_codes[i]],
+            'confidence': _py_float(self.confidence[i]),
+            'method': method.label
+        }
+        if method == Method.RULE_MATCH:
+            result['matched_keyword'] = self.keywords[self.keyword_codes[i]]
+        elif method == Method.ML_MODEL:
+            result['probabilities'] = {
+                cat: _py_float(prob) for cat, prob in zip(self.probability_columns, self.probabilities[i])
+            }
+        result['original_text'] = self.original_text[i]
+        result['needs_review'] = bool(self.needs_review[i])
+
+        if self.explanation_codes is not None:
+            explanation = self.explanations.get(int(self.explanation_codes[i]))
+            if explanation is not None:
+                result['explanation'] = dict(explanation)
+        return result
+
+    def to_dicts(self):
+        """Every row as a prediction dict (the old list-of-dicts output)"""
+        return [self._row(i) for i in range(len(self))]
+
+    def category_labels(self):
+        """Category name per row (object array of shared strings)"""
+        return self.categories[self.category_codes]
+
+    def method_labels(self):
+        """Method name per row"""
+        return METHOD_LABELS[self.method_codes]
+
+    def keyword_labels(self):
+        """Matched keyword per row, None where no rule matched"""
+        keywords = np.append(self.keywords, None)
+        return keywords[self.keyword_codes]
+
+    def to_dataframe(self):
+        """DataFrame in the batch_predict(as_dataframe=True) layout"""
+        results = pd.DataFrame({
+            'category': self.category_labels(),
+            'confidence': self.confidence,
+            'method': self.method_labels(),
+            'matched_keyword': self.keyword_labels(),
+            'original_text': np.asarray(self.original_text, dtype=object),
+            'needs_review': self.needs_review
+        })
+        if self.probabilities is not None:
+            for col, cat in enumerate(self.probability_columns):
+                results[f'prob_{cat}'] = self.probabilities[:, col]
+        if self.explanation_codes is not None:
+            results['explanation'] = [self.explanations.get(code) for code in self.explanation_codes.tolist()]
+        return results
+
+    def to_arrow(self):
+        """
+        Typed Arrow table built straight from the arrays
+
+        Category, method and keyword codes become dictionary arrays over the
+        existing code arrays, and confidence wraps the float32 array without
+        a copy.
+        """
+        if pa is None:
+            raise ImportError("Arrow output requires pyarrow. Install it with `pip install pyarrow`")
+
+        keyword_codes = pa.array(self.keyword_codes, mask=self.keyword_codes < 0)
+        columns = {
+            'category': pa.DictionaryArray.from_arrays(
+                pa.array(self.category_codes), pa.array(self.categories, type=pa.string())
+            ),
+            'confidence': pa.array(self.confidence),
+            'method': pa.DictionaryArray.from_arrays(
+                pa.array(self.method_codes), pa.array(METHOD_LABELS, type=pa.string())
+            ),
+            'matched_keyword': pa.DictionaryArray.from_arrays(
+                keyword_codes, pa.array(self.keywords, type=pa.string())
+            ),
+            'original_text': pa.array(np.asarray(self.original_text, dtype=object), type=pa.string(), from_pandas=True),
+            'needs_review': pa.array(self.needs_review)
+        }
+        if self.probabilities is not None:
+            for col, cat in enumerate(self.probability_columns):
+                columns[f'prob_{cat}'] = pa.array(np.ascontiguousarray(self.probabilities[:, col]))
+        if self.explanation_codes is not None:
+            # Nested explanations are stored as JSON text
+            explanations = [self.explanations.get(code) for code in self.explanation_codes.tolist()]
+            columns['explanation'] = pa.array(
+                [None if e is None else json.dumps(e, default=str) for e in explanations], type=pa.string()
+            )
+        return pa.table(columns)
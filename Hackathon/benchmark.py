@@ -0,0 +1,181 @@
+import argparse
+import json
+import os
+import platform
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+
+from artifacts import load_artifacts
+from predict import TransactionPredictor
+from synthetic_data import generate_transactions
+
+
+def latency_summary(latencies, unit_scale=1e6, unit='us'):
+    """p50/p99/mean of per-call latencies (seconds in, unit out) plus calls/second"""
+    latencies = np.asarray(latencies)
+    total = latencies.sum()
+    return {
+        'calls': len(latencies),
+        f'p50_{unit}': float(np.percentile(latencies, 50) * unit_scale),
+        f'p99_{unit}': float(np.percentile(latencies, 99) * unit_scale),
+        f'mean_{unit}': float(latencies.mean() * unit_scale),
+        'throughput_per_second': float(len(latencies) / total) if total > 0 else 0.0
+    }
+
+
+def time_per_call(func, inputs):
+    """Call func on every input, returning per-call latencies in seconds"""
+    latencies = []
+    for item in inputs:
+        start = time.perf_counter()
+        func(item)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def measure_peak_memory(func):
+    """Run func once under tracemalloc and return (result, peak MB)"""
+    tracemalloc.start()
+    try:
+        result = func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, peak / (1024 * 1024)
+
+
+def bench_model_load(model_path, repeats=5):
+    latencies = time_per_call(lambda _: load_artifacts(model_path), range(repeats))
+    return latency_summary(latencies, 1e3, 'ms')
+
+
+def bench_single_calls(predictor, descriptions, n_calls=2000):
+    """Per-call latency of the single-transaction hot paths"""
+    sample = descriptions[:n_calls]
+    clean = [predictor.preprocess_text(text) for text in sample]
+
+    return {
+        'preprocess_text': latency_summary(time_per_call(predictor.preprocess_text, sample)),
+        'rule_match': latency_summary(time_per_call(predictor.rule_match, clean)),
+        'ml_predict': latency_summary(time_per_call(predictor.ml_predict, clean))
+    }
+
+
+def bench_explain(predictor, descriptions, n_lime=20, n_linear=500):
+    """LIME is expensive, so it gets a much smaller sample than the linear mode"""
+    clean = [predictor.preprocess_text(text) for text in descriptions]
+    return {
+        'explain_prediction_lime': latency_summary(
+            time_per_call(predictor.explain_prediction, clean[:n_lime]), 1e3, 'ms'
+        ),
+        'explain_prediction_linear': latency_summary(
+            time_per_call(lambda text: predictor.explain_prediction(text, mode='linear'), clean[:n_linear]), 1e3, 'ms'
+        )
+    }
+
+
+def bench_batch(predictor, df, repeats=3):
+    """Whole-dataset batch_predict: wall time, throughput and peak traced memory"""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        predictor.batch_predict(df, show_progress=False, as_dataframe=True)
+        timings.append(time.perf_counter() - start)
+
+    _, peak_mb = measure_peak_memory(
+        lambda: predictor.batch_predict(df, show_progress=False, as_dataframe=True)
+    )
+
+    best = min(timings)
+    return {
+        'rows': len(df),
+        'distinct_descriptions': int(df['description'].nunique()),
+        'best_seconds': best,
+        'median_seconds': float(np.median(timings)),
+        'throughput_per_second': len(df) / best if best > 0 else 0.0,
+        'peak_memory_mb': peak_mb
+    }
+
+
+def run_benchmarks(sizes, model_path='models/', single_calls=2000, seed=42):
+    """Run every benchmark and return a JSON-serializable report"""
+    report = {
+        'timestamp': datetime.now().isoformat(),
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'processor': platform.processor(),
+            'cpu_count': os.cpu_count()
+        },
+        'seed': seed,
+        'model_load': bench_model_load(model_path),
+        'datasets': {}
+    }
+
+    # Caching would hide the cost of the hot paths, so it is disabled here
+    predictor = TransactionPredictor(model_path=model_path, cache_size=0)
+
+    for size in sizes:
+        print(f"\n→ Generating {size} synthetic transactions...")
+        # Bank-export style descriptions with realistic category imbalance
+        df = generate_transactions(size, seed=seed, class_weights='realistic')
+        descriptions = df['description'].tolist()
+
+        print(f"→ Benchmarking {len(df)} transactions...")
+        results = {'batch_predict': bench_batch(predictor, df)}
+        results.update(bench_single_calls(predictor, descriptions, single_calls))
+        report['datasets'][str(size)] = results
+
+        print(f"  batch_predict: {results['batch_predict']['throughput_per_second']:.0f} transactions/second, "
+              f"peak {results['batch_predict']['peak_memory_mb']:.1f} MB")
+        print(f"  ml_predict p99: {results['ml_predict']['p99_us']:.0f}us")
+
+    report['explain'] = bench_explain(predictor, descriptions)
+
+    return report
+
+
+def compare_reports(current, baseline):
+    """Print throughput ratios of current vs baseline for every shared benchmark"""
+    print("\n=== Comparison with baseline ===\n")
+    for size, results in current['datasets'].items():
+        base_results = baseline.get('datasets', {}).get(size)
+        if not base_results:
+            continue
+        for name, metrics in results.items():
+            base = base_results.get(name, {}).get('throughput_per_second')
+            if base:
+                ratio = metrics['throughput_per_second'] / base
+                flag = "  ⚠ regression" if ratio < 0.9 else ""
+                print(f"  [{size}] {name}: {ratio:.2f}x{flag}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the transaction categorizer hot paths")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 100000, 1000000])
+    parser.add_argument('--model-path', default='models/')
+    parser.add_argument('--single-calls', type=int, default=2000, help="Calls per single-transaction benchmark")
+    parser.add_argument('--output-dir', default='outputs/benchmarks')
+    parser.add_argument('--seed', type=int, default=42, help="Seed for the synthetic datasets")
+    parser.add_argument('--compare', help="Earlier benchmark JSON to compare against")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("AI TRANSACTION CATEGORIZER - BENCHMARKS")
+    print("=" * 60)
+
+    report = run_benchmarks(args.sizes, args.model_path, args.single_calls, args.seed)
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    output_path = os.path.join(args.output_dir, f"benchmark_{datetime.now():%Y%m%d_%H%M%S}.json")
+    for path in (output_path, os.path.join(args.output_dir, 'latest.json')):
+        with open(path, 'w') as f:
+            json.dump(report, f, indent=2)
+    print(f"\n✓ Results saved to {output_path}")
+
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            compare_reports(report, json.load(f))
@@ -0,0 +1,114 @@
+import json
+import os
+import threading
+from datetime import datetime
+
+import numpy as np
+
+
+class FeedbackStore:
+    """
+    Append-only JSONL log of reviewer corrections plus an exact-match override table
+
+    Each correction is one line in the log, keyed on the preprocessed
+    description; the latest correction for a description wins. The log is
+    read back on startup, so overrides survive restarts. With a normalizer,
+    logged records are re-keyed from their raw text on load, so overrides
+    keep matching after the text normalization changes.
+    """
+
+    def __init__(self, path='data/feedback.jsonl', normalizer=None):
+        self.path = path
+        self.normalizer = normalizer
+        self._overrides = {}
+        self._records = []
+        self._lock = threading.Lock()
+        self.load()
+
+    def __len__(self):
+        return len(self._overrides)
+
+    def load(self):
+        """(Re)read the log from disk and rebuild the override table"""
+        records = []
+        if self.path and os.path.exists(self.path):
+            with open(self.path, 'r') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        records.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        # A torn last line from an interrupted write
+                        continue
+
+        with self._lock:
+            self._records = records
+            self._overrides = {self._key(record): record['category'] for record in records}
+
+    def _key(self, record):
+        if self.normalizer is None:
+            return record['clean_text']
+        return self.normalizer(record['text'])
+
+    def record(self, text, clean_text, category, prediction=None):
+        """
+        Append one correction to the log and make it an override immediately
+
+        Args:
+            text: Original transaction description
+            clean_text: Preprocessed description (the override key)
+            category: Category chosen by the reviewer
+            prediction: Optional result dict the reviewer corrected
+
+        Returns:
+            The stored record
+        """
+        prediction = prediction or {}
+        record = {
+            'timestamp': datetime.now().isoformat(),
+            'text': text,
+            'clean_text': clean_text,
+            'category': category,
+            'predicted_category': prediction.get('category'),
+            'predicted_confidence': prediction.get('confidence'),
+            'predicted_method': prediction.get('method')
+        }
+
+        with self._lock:
+            if self.path:
+                os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+                with open(self.path, 'a') as f:
+                    f.write(json.dumps(record) + '\n')
+            self._records.append(record)
+            self._overrides[clean_text] = category
+
+        return record
+
+    def get(self, clean_text):
+        """Override category for a preprocessed description, or None"""
+        return self._overrides.get(clean_text)
+
+    def lookup(self, clean_texts):
+        """Override categories for many preprocessed descriptions (None where there is none)"""
+        overrides = self._overrides
+        if not overrides:
+            return np.full(len(clean_texts), None, dtype=object)
+        return np.array([overrides.get(text) for text in clean_texts], dtype=object)
+
+    def records(self, since=None):
+        """Stored corrections, optionally only those logged after an ISO timestamp"""
+        with self._lock:
+            records = list(self._records)
+        if since is None:
+            return records
+        return [record for record in records if record['timestamp'] > since]
+
+    def stats(self):
+        """Correction and override counts"""
+        with self._lock:
+            return {
+                'corrections': len(self._records),
+                'overrides': len(self._overrides)
+            }
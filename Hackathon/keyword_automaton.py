@@ -0,0 +1,148 @@
+from collections import deque
+
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick multi-keyword matcher for the taxonomy rule engine
+
+    All keywords are compiled into one trie with failure links, so a text is
+    scanned once no matter how many keywords the taxonomy holds.
+
+    Precedence when several keywords occur in the same text:
+        'category': the keyword listed first in taxonomy.yaml wins
+                    (same result as checking categories in order)
+        'longest':  the longest matching keyword wins, ties go to taxonomy order
+    """
+
+    PRECEDENCES = ('category', 'longest')
+
+    def __init__(self, word_boundary=False, precedence='category'):
+        if precedence not in self.PRECEDENCES:
+            raise ValueError(f"precedence must be one of {self.PRECEDENCES}, got '{precedence}'")
+
+        self.word_boundary = word_boundary
+        self.precedence = precedence
+
+        # Trie state: transitions, failure link, keyword id ending here,
+        # and the nearest node on the failure chain that ends a keyword
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [-1]
+        self._dict_link = [0]
+
+        self._keywords = []
+        self._categories = []
+        self._built = False
+
+    def __len__(self):
+        return len(self._keywords)
+
+    def add(self, keyword, category):
+        """Add a keyword; earlier additions take precedence over later ones"""
+        if not keyword:
+            return
+
+        node = 0
+        for ch in keyword:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(-1)
+                self._dict_link.append(0)
+            node = nxt
+
+        # A keyword repeated under a later category never wins, keep the first
+        if self._output[node] == -1:
+            self._output[node] = len(self._keywords)
+            self._keywords.append(keyword)
+            self._categories.append(category)
+
+        self._built = False
+
+    def build(self):
+        """Compute failure and dictionary links (breadth-first over the trie)"""
+        queue = deque()
+        for child in self._goto[0].values():
+            self._fail[child] = 0
+            self._dict_link[child] = 0
+            queue.append(child)
+
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                fail = self._goto[fail].get(ch, 0)
+                if fail == child:
+                    fail = 0
+
+                self._fail[child] = fail
+                self._dict_link[child] = fail if self._output[fail] != -1 else self._dict_link[fail]
+                queue.append(child)
+
+        self._built = True
+        return self
+
+    @classmethod
+    def from_rules(cls, rule_engine, word_boundary=False, precedence='category'):
+        """Compile a {category: [keywords]} mapping in taxonomy order"""
+        automaton = cls(word_boundary=word_boundary, precedence=precedence)
+        for category, keywords in rule_engine.items():
+            for keyword in keywords:
+                automaton.add(keyword, category)
+        return automaton.build()
+
+    @staticmethod
+    def _is_word_char(ch):
+        return ch.isalnum() or ch == '_'
+
+    def _on_boundary(self, text, start, end):
+        if start > 0 and self._is_word_char(text[start - 1]):
+            return False
+        if end < len(text) and self._is_word_char(text[end]):
+            return False
+        return True
+
+    def search(self, text):
+        """
+        Find the winning keyword in text
+
+        Returns:
+            (category, keyword) tuple, or None if nothing matched
+        """
+        if not self._built:
+            self.build()
+
+        goto, fail, output, dict_link = self._goto, self._fail, self._output, self._dict_link
+        longest = self.precedence == 'longest'
+
+        best = -1
+        state = 0
+        for pos, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+
+            node = state if output[state] != -1 else dict_link[state]
+            while node:
+                kw_id = output[node]
+                if best == -1 or self._beats(kw_id, best, longest):
+                    end = pos + 1
+                    if not self.word_boundary or self._on_boundary(text, end - len(self._keywords[kw_id]), end):
+                        best = kw_id
+                node = dict_link[node]
+
+        if best == -1:
+            return None
+        return self._categories[best], self._keywords[best]
+
+    def _beats(self, kw_id, best, longest):
+        if longest:
+            new_len, best_len = len(self._keywords[kw_id]), len(self._keywords[best])
+            if new_len != best_len:
+                return new_len > best_len
+        return kw_id < best
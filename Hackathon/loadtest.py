@@ -0,0 +1,102 @@
+import argparse
+import json
+import os
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+
+def post_json(url, payload):
+    """POST a JSON payload and return the decoded response"""
+    request = urllib.request.Request(
+        url,
+        data=json.dumps(payload).encode('utf-8'),
+        headers={'Content-Type': 'application/json'}
+    )
+    with urllib.request.urlopen(request) as response:
+        return json.loads(response.read())
+
+
+def run_load_test(base_url, descriptions, n_requests=2000, concurrency=32, batch_size=1):
+    """
+    Fire n_requests at the scoring service from `concurrency` client threads
+
+    batch_size=1 hits /predict, larger values hit /predict/batch.
+
+    Returns:
+        Dictionary with latency percentiles (ms) and throughput
+    """
+    if batch_size == 1:
+        url = f'{base_url}/predict'
+        payloads = [{'description': descriptions[i % len(descriptions)]} for i in range(n_requests)]
+    else:
+        url = f'{base_url}/predict/batch'
+        payloads = [
+            {'descriptions': [descriptions[(i * batch_size + j) % len(descriptions)] for j in range(batch_size)]}
+            for i in range(n_requests)
+        ]
+
+    def timed_request(payload):
+        start = time.perf_counter()
+        post_json(url, payload)
+        return time.perf_counter() - start
+
+    # Warm-up so model load and first-call overheads are not measured
+    for payload in payloads[:10]:
+        post_json(url, payload)
+
+    start_time = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = np.array(list(pool.map(timed_request, payloads))) * 1000
+    elapsed = time.perf_counter() - start_time
+
+    return {
+        'endpoint': url,
+        'requests': n_requests,
+        'concurrency': concurrency,
+        'batch_size': batch_size,
+        'elapsed_seconds': elapsed,
+        'requests_per_second': n_requests / elapsed,
+        'transactions_per_second': n_requests * batch_size / elapsed,
+        'latency_ms': {
+            'p50': float(np.percentile(latencies, 50)),
+            'p95': float(np.percentile(latencies, 95)),
+            'p99': float(np.percentile(latencies, 99)),
+            'max': float(latencies.max())
+        }
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test for serve.py")
+    parser.add_argument('--url', default='http://127.0.0.1:8000')
+    parser.add_argument('--data', default='data/synthetic_transactions.csv')
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--batch-size', type=int, default=1)
+    parser.add_argument('--output', default='outputs/loadtest.json')
+    args = parser.parse_args()
+
+    descriptions = pd.read_csv(args.data)['description'].astype(str).tolist()
+
+    print(f"→ Load testing {args.url} ({args.requests} requests, concurrency {args.concurrency})...")
+    report = run_load_test(args.url, descriptions, args.requests, args.concurrency, args.batch_size)
+    report['timestamp'] = datetime.now().isoformat()
+
+    with urllib.request.urlopen(f'{args.url}/health') as response:
+        report['server'] = json.loads(response.read())
+
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    print(f"\n✓ Load test complete!")
+    print(f"  Throughput: {report['requests_per_second']:.0f} requests/second "
+          f"({report['transactions_per_second']:.0f} transactions/second)")
+    print(f"  Latency p50: {report['latency_ms']['p50']:.1f}ms  "
+          f"p99: {report['latency_ms']['p99']:.1f}ms")
+    print(f"  Report saved to {args.output}")
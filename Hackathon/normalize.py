@@ -0,0 +1,104 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+# Bump when the output of normalize_text changes, so models record what they were trained on
+NORMALIZATION_VERSION = 2
+
+# Characters dropped outright, applied with one str.translate call
+_DELETE_TABLE = str.maketrans('', '', '*#')
+
+# Payment processor prefixes, card masks, store numbers and reference ids (text already lower case)
+_NOISE = re.compile(
+    r'^(?:(?:sq|tst|sp|pp|paypal)\s*\*|(?:pos|ach|checkcard)\s)\s*'    # "SQ *", "TST* ", "POS "
+    r'|(?<![a-z0-9])(?:x{2,}|\*{2,})-?\d{2,4}\b'                        # "XXXX1234", "****1234"
+    r'|#\s*\d+\b'                                                        # "#0123"
+    r'|\b(?:ref|txn|trx|auth)\s*(?:no\.?|:)?\s*#?\s*[a-z]*\d[a-z0-9]*'  # "REF01234", "TXN: 9A7"
+    r'|\b\d{5,}\b'                                                       # bare transaction ids
+)
+
+# Most descriptions carry no noise at all; these cheap checks skip _NOISE and the translate for them
+_NOISE_CHARS = re.compile(r'[\d*#]')
+_NOISE_PREFIX = re.compile(r'(?:pos|ach|checkcard)\s')
+
+# Cities seen at the end of bank-export descriptions, optionally followed by a state/province code
+LOCATIONS = [
+    'new york', 'san francisco', 'los angeles', 'seattle', 'austin', 'chicago', 'boston',
+    'houston', 'dallas', 'denver', 'miami', 'atlanta', 'portland', 'toronto', 'vancouver',
+    'london', 'sydney', 'melbourne', 'mumbai', 'bangalore', 'bengaluru', 'delhi', 'new delhi',
+    'hyderabad', 'chennai', 'pune', 'kolkata'
+]
+_LOCATION_SET = frozenset(LOCATIONS)
+_LOCATION_TAILS = frozenset(location.split()[-1] for location in LOCATIONS)
+_LOCATION_WORDS = max(len(location.split()) for location in LOCATIONS)
+
+
+def _is_region(word):
+    return len(word) == 2 and word.isascii() and word.isalpha()
+
+
+def _strip_location(words):
+    """Drop a trailing city (plus region code) from a word list, using set lookups instead of a regex"""
+    if words[-1] in _LOCATION_TAILS:
+        ends = [len(words)]
+    elif _is_region(words[-1]) and words[-2] in _LOCATION_TAILS:
+        ends = [len(words) - 1]
+    else:
+        return words
+    for end in ends:
+        for size in range(_LOCATION_WORDS, 0, -1):
+            # Something has to be left in front of the location
+            if end - size >= 1 and ' '.join(words[end - size:end]) in _LOCATION_SET:
+                return words[:end - size]
+    return words
+
+
+def normalize_text(text):
+    """
+    Normalize one transaction description for the rules, the model and the caches
+
+    Lower case, merchant noise removed (processor prefixes, card masks,
+    store numbers, reference ids, a trailing city), '*' and '#' dropped and
+    whitespace collapsed. Missing values become "".
+    """
+    # Strings skip pd.isna on the hot path; None, NaN and pd.NA all become ""
+    if not isinstance(text, str):
+        if pd.isna(text):
+            return ""
+        text = str(text)
+
+    text = text.lower()
+    if _NOISE_CHARS.search(text) or _NOISE_PREFIX.match(text):
+        text = _NOISE.sub(' ', text).translate(_DELETE_TABLE)
+    words = text.split()
+    if len(words) > 1:
+        words = _strip_location(words)
+    return ' '.join(words)
+
+
+def normalize_keyword(keyword):
+    """
+    Taxonomy keyword in the form it takes inside normalized text
+
+    Keywords go through normalize_text too, since anything it strips from
+    a description can never be matched: "Uber London" becomes "uber", as
+    "UBER LONDON" does. A keyword that is nothing but noise becomes "".
+    """
+    return normalize_text(keyword)
+
+
+def normalize_series(texts):
+    """
+    normalize_text for a whole column
+
+    Each distinct description is normalized once with normalize_text and
+    mapped back to its rows, so repeated merchants cost nothing extra and
+    training, batch and single-row inference see exactly the same text
+    (pandas string ops differ from str on Unicode whitespace and case).
+    """
+    codes, uniques = pd.factorize(pd.Series(texts, dtype=object))
+    clean = [normalize_text(text) for text in uniques]
+    # factorize marks missing values with -1, which lands on the trailing ""
+    values = np.array(clean + [""], dtype=object)
+    return pd.Series(values[codes], index=getattr(texts, 'index', None))
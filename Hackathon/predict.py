@@ -1,17 +1,54 @@
-import pickle
 import yaml
 import pandas as pd
 import numpy as np
 import time
 import os
+import json
+import argparse
+import copy
+import itertools
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from lime.lime_text import LimeTextExplainer
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.utils import Bunch, murmurhash3_32
+# Parquet output is optional; CSV works without pyarrow
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+from keyword_automaton import KeywordAutomaton
+from prediction_cache import PredictionCache
+from feedback_store import FeedbackStore
+from batch_result import BatchResult, Method
+from normalize import normalize_text, normalize_series, normalize_keyword, NORMALIZATION_VERSION
+from artifacts import load_artifacts, read_manifest, verify_artifacts, watch_paths
 
-class TransactionPredictor:
-    def __init__(self, model_path='models/'):
-        """Load trained model and configuration"""
-        self.model_path = model_path
-        self.load_model()
-        self.load_rules()
+class ModelBundle:
+    """
+    Immutable snapshot of everything loaded from the model directory
+    
+    Hot reload builds a new bundle and swaps it in with a single assignment,
+    so a request holding the old bundle finishes on a consistent model,
+    vectorizer and category list. Reviewer corrections do the same:
+    with_correction returns a new bundle with its own copy of the linear
+    coefficients and leaves this one untouched.
+    """
+    _versions = itertools.count(1)
+    
+    def __init__(self, model, vectorizer, categories, manifest=None):
+        self.version = next(self._versions)
+        self.model = model
+        self.vectorizer = vectorizer
+        self.categories = categories
+        self.manifest = manifest
+        
+        self._build_class_index()
+        self._find_linear_component()
+        self._build_linear_explainer()
         
         # Initialize explainer
         try:
@@ -19,136 +56,589 @@ class TransactionPredictor:
         except Exception as e:
             print(f"Warning: LIME initialization failed: {e}")
             self.explainer = None
+    
+    def _build_class_index(self):
+        """Precompute the mapping from predict_proba columns to self.categories"""
+        model_classes = list(self.model.classes_)
+        self.class_labels = np.asarray(self.categories, dtype=object)
+        self.class_index = np.array([model_classes.index(cat) for cat in self.categories])
+        # classes_ is sorted like categories, so the reorder is normally a no-op
+        self._reorder_proba = not np.array_equal(self.class_index, np.arange(len(model_classes)))
+    
+    def _find_linear_component(self):
+        """The model itself if it is linear, else the first linear ensemble member (None if there is none)"""
+        linear = self.model if hasattr(self.model, 'coef_') else None
+        for estimator in getattr(self.model, 'estimators_', []):
+            if linear is None and hasattr(estimator, 'coef_'):
+                linear = estimator
+        
+        self.linear = linear
+        self.linear_classes = None
+        if linear is not None:
+            self.linear_classes = list(linear.classes_)
+            if linear is not self.model and hasattr(self.model, 'le_'):
+                # VotingClassifier members are fit on label-encoded targets
+                self.linear_classes = list(self.model.le_.inverse_transform(linear.classes_))
+    
+    def _build_linear_explainer(self):
+        """Cache the linear component's coefficients (rows ordered as self.categories) for fast explanations"""
+        self.linear_coef = None
+        self.feature_names = None
+        self.hasher = None
+        
+        linear = self.linear
+        if linear is None:
+            return
+        
+        # Hashed features have no vocabulary; terms are recovered per text instead
+        steps = [step for _, step in getattr(self.vectorizer, 'steps', [(None, self.vectorizer)])]
+        self.hasher = next((step for step in steps if isinstance(step, HashingVectorizer)), None)
+        if self.hasher is None and not hasattr(self.vectorizer, 'get_feature_names_out'):
+            return
+        
+        coef = np.asarray(linear.coef_)
+        if coef.shape[0] == 1:
+            # Binary models store one row for the positive class
+            coef = np.vstack([-coef[0], coef[0]])
+        self.linear_coef = coef[[self.linear_classes.index(cat) for cat in self.categories]]
+        if self.hasher is None:
+            self.feature_names = np.asarray(self.vectorizer.get_feature_names_out(), dtype=object)
+        else:
+            self._analyzer = self.hasher.build_analyzer()
+    
+    def feature_names_for(self, text):
+        """Feature index -> name lookup for one preprocessed text"""
+        if self.hasher is None:
+            return self.feature_names
+        # Same bucket formula as HashingVectorizer; on a collision the first term is kept
+        names = {}
+        for term in self._analyzer(text):
+            names.setdefault(abs(murmurhash3_32(term, positive=False)) % self.hasher.n_features, term)
+        return names
+    
+    def _can_learn(self, category):
+        # Binary models (one coefficient row) only get the exact-match override
+        linear = self.linear
+        return linear is not None and category in self.linear_classes and linear.coef_.shape[0] >= 2
+    
+    def learn_correction(self, clean_text, category, learning_rate=0.3, max_steps=5, target=0.4):
+        """
+        Nudge the linear component towards a reviewer's category for one text, in place
+        
+        Only for bundles that no request can see yet (feedback replay during
+        load); a published bundle is changed through with_correction.
+        
+        Takes single-sample multinomial log-loss gradient steps on the
+        text's non-zero feature columns only, and stops once the category
+        gets `target` softmax probability from the linear component. The
+        intercept is left alone, so descriptions without those features keep
+        their predictions; the small step and target keep one correction
+        from dominating the words it shares with other merchants.
+        
+        Returns:
+            Number of update steps taken (0 if there was nothing to update)
+        """
+        if not self._can_learn(category):
+            return 0
+        x = self.vectorizer.transform([clean_text]).tocsr()
+        if x.nnz == 0:
+            return 0
+        
+        linear = self.linear
+        # Memory-mapped arrays are read-only; updates go to a private copy
+        if not linear.coef_.flags.writeable:
+            linear.coef_ = np.array(linear.coef_)
+        
+        coef, intercept = linear.coef_, linear.intercept_
+        label = self.linear_classes.index(category)
+        steps = 0
+        while steps < max_steps:
+            scores = coef[:, x.indices] @ x.data + intercept
+            proba = np.exp(scores - scores.max())
+            proba /= proba.sum()
+            if proba[label] >= target:
+                break
+            proba[label] -= 1
+            coef[:, x.indices] -= learning_rate * np.outer(proba, x.data)
+            steps += 1
+        
+        if steps:
+            self.version = next(self._versions)
+            self._build_linear_explainer()
+        return steps
+    
+    def with_correction(self, clean_text, category, **options):
+        """
+        New bundle with a reviewer correction applied (see learn_correction)
+        
+        The model object and its linear component are shallow-copied and
+        the coefficients deep-copied, so requests still holding this bundle
+        never see a half-updated matrix. Everything else is shared.
+        
+        Returns:
+            (bundle, steps); bundle is self when there was nothing to update
+        """
+        if not self._can_learn(category):
+            return self, 0
+        
+        linear = copy.copy(self.linear)
+        linear.coef_ = np.array(self.linear.coef_)
+        swap = lambda estimator: linear if estimator is self.linear else estimator
+        
+        if self.linear is self.model:
+            model = linear
+        else:
+            model = copy.copy(self.model)
+            model.estimators_ = [swap(estimator) for estimator in self.model.estimators_]
+            if hasattr(self.model, 'named_estimators_'):
+                model.named_estimators_ = Bunch(**{
+                    name: swap(estimator) for name, estimator in self.model.named_estimators_.items()
+                })
+        
+        bundle = copy.copy(self)
+        bundle.model = model
+        bundle.linear = linear
+        steps = bundle.learn_correction(clean_text, category, **options)
+        return (bundle, steps) if steps else (self, 0)
+    
+    def predict_proba(self, texts):
+        """Probability matrix for preprocessed texts, columns ordered as self.categories"""
+        probabilities = self.model.predict_proba(self.vectorizer.transform(texts))
+        if self._reorder_proba:
+            probabilities = probabilities[:, self.class_index]
+        return probabilities
+
+class RuleSet:
+    """Immutable snapshot of the taxonomy rules compiled into one keyword automaton"""
+    _versions = itertools.count(1)
+    
+    def __init__(self, rule_engine=None, thresholds=None, automaton=None):
+        self.version = next(self._versions)
+        self.rule_engine = rule_engine or {}
+        self.thresholds = thresholds or {}
+        self.automaton = automaton or KeywordAutomaton.from_rules({})
+
+class TransactionPredictor:
+    def __init__(self, model_path='models/', word_boundary=False, rule_precedence='category',
+                 cache_size=10000, cache_ttl=None, cache_check_interval=1.0,
+                 feedback_path='data/feedback.jsonl'):
+        """Load trained model and configuration"""
+        self.model_path = model_path
+        self.word_boundary = word_boundary
+        self.rule_precedence = rule_precedence
+        
+        # Predictions keyed on preprocessed text and the loaded model/rule versions
+        self.cache = PredictionCache(max_size=cache_size, ttl=cache_ttl)
+        self.cache_check_interval = cache_check_interval
+        
+        # Reviewer corrections: exact-match overrides plus online model updates
+        self.feedback = FeedbackStore(feedback_path, normalizer=normalize_text)
+        
+        self._reload_lock = threading.Lock()
+        self._watcher = None
+        self._stop_watching = threading.Event()
+        self._rules = RuleSet()
+        
+        self.load_model()
+        self.load_rules()
+        
+        self._last_artifact_check = time.monotonic()
+    
+    # Read-only views of the current snapshots
+    model = property(lambda self: self._bundle.model)
+    vectorizer = property(lambda self: self._bundle.vectorizer)
+    categories = property(lambda self: self._bundle.categories)
+    manifest = property(lambda self: self._bundle.manifest)
+    class_labels = property(lambda self: self._bundle.class_labels)
+    class_index = property(lambda self: self._bundle.class_index)
+    explainer = property(lambda self: self._bundle.explainer)
+    rule_engine = property(lambda self: self._rules.rule_engine)
+    thresholds = property(lambda self: self._rules.thresholds)
+    rule_automaton = property(lambda self: self._rules.automaton)
         
     def load_model(self):
-        """Load trained ML components"""
+        """Load trained ML components (numpy arrays memory-mapped when a manifest is present)"""
         try:
-            with open(f'{self.model_path}model.pkl', 'rb') as f:
-                self.model = pickle.load(f)
+            signature = self._file_signature(watch_paths(self.model_path))
+            bundle = ModelBundle(*load_artifacts(self.model_path))
+            self._replay_feedback(bundle)
             
-            with open(f'{self.model_path}vectorizer.pkl', 'rb') as f:
-                self.vectorizer = pickle.load(f)
+            trained_with = (bundle.manifest or {}).get('normalization', 1)
+            if trained_with != NORMALIZATION_VERSION:
+                print(f"⚠️ Model was trained with text normalization v{trained_with} (current v{NORMALIZATION_VERSION}); "
+                      "retrain with `python train.py` for best accuracy")
             
-            with open(f'{self.model_path}categories.pkl', 'rb') as f:
-                self.categories = pickle.load(f)
+            # Swap in the new model in one step
+            self._bundle = bundle
+            self._model_signature = signature
+            self.cache.clear()
             
             print("✓ Model loaded successfully")
         except FileNotFoundError:
             raise Exception("Model not found! Please run train.py first.")
     
+    def predict_proba(self, texts, bundle=None):
+        """Probability matrix for preprocessed texts, columns ordered as self.categories"""
+        return (bundle or self._bundle).predict_proba(texts)
+    
+    def _replay_feedback(self, bundle):
+        """
+        Re-apply reviewer corrections to a freshly loaded bundle
+        
+        train.py records the newest correction it trained on as
+        'feedback_until'; only later ones are replayed. Models without it
+        (out-of-core or older runs) never saw the log, so all are replayed.
+        """
+        since = (bundle.manifest or {}).get('feedback_until')
+        records = self.feedback.records(since=since)
+        for record in records:
+            bundle.learn_correction(normalize_text(record['text']), record['category'])
+        if records:
+            print(f"✓ Replayed {len(records)} reviewer corrections")
+    
+    def record_feedback(self, transaction_text, category, prediction=None):
+        """
+        Apply a reviewer's correction without retraining
+        
+        The correction is logged, becomes an exact-match override for the
+        same description straight away, and nudges the linear component so
+        similar descriptions move towards the category too.
+        
+        Args:
+            transaction_text: Raw transaction description
+            category: Correct category
+            prediction: Optional result dict that was corrected (stored with the log entry)
+        
+        Returns:
+            Dictionary with the category, update steps and elapsed milliseconds
+        """
+        start_time = time.perf_counter()
+        with self._reload_lock:
+            bundle = self._bundle
+            if category not in bundle.categories:
+                raise ValueError(f"Unknown category '{category}'")
+            
+            clean_text = self.preprocess_text(transaction_text)
+            self.feedback.record(transaction_text, clean_text, category, prediction)
+            # Published like a hot reload: requests in flight finish on the old bundle
+            self._bundle, steps = bundle.with_correction(clean_text, category)
+            # Cached entries were scored before the correction
+            self.cache.clear()
+        
+        return {
+            'category': category,
+            'model_steps': steps,
+            'elapsed_ms': (time.perf_counter() - start_time) * 1000
+        }
+    
+    def feedback_stats(self):
+        """Counts of logged corrections and active overrides"""
+        return self.feedback.stats()
+    
     def load_rules(self, yaml_path='config/taxonomy.yaml'):
-        """Load categorization rules from YAML"""
-        self.rule_engine = {}
-        self.thresholds = {}
+        """
+        Load categorization rules from YAML and compile them into one automaton
+        
+        If the file can't be parsed, the rules already loaded stay active.
+        
+        Returns:
+            True if the rule set was replaced, False if loading failed
+        """
+        self.rules_path = yaml_path
+        self._rules_signature = self._file_signature([yaml_path])
         
         if not os.path.exists(yaml_path):
             print(f"⚠️ Warning: {yaml_path} not found. Running without rule engine.")
-            return
+            self._rules = RuleSet()
+            self.cache.clear()
+            return True
 
         try:
             with open(yaml_path, 'r') as f:
                 config = yaml.safe_load(f)
             
+            rule_engine = {}
+            thresholds = {}
             if config and 'categories' in config:
                 for category in config['categories']:
                     cat_name = category['name']
                     keywords = category.get('keywords', [])
                     threshold = category.get('threshold', 0.7)
                     
-                    self.rule_engine[cat_name] = [kw.lower() for kw in keywords]
-                    self.thresholds[cat_name] = threshold
+                    normalized = [normalize_keyword(kw) for kw in keywords]
+                    for kw, norm in zip(keywords, normalized):
+                        if not norm:
+                            print(f"⚠️ Keyword '{kw}' ({cat_name}) is removed by text normalization and can never match")
+                    rule_engine[cat_name] = [norm for norm in normalized if norm]
+                    thresholds[cat_name] = threshold
+            
+            # Optional matching block overrides the constructor defaults
+            matching = (config or {}).get('matching') or {}
+            automaton = KeywordAutomaton.from_rules(
+                rule_engine,
+                word_boundary=matching.get('word_boundary', self.word_boundary),
+                precedence=matching.get('precedence', self.rule_precedence)
+            )
             
-            print(f"✓ Loaded rules for {len(self.rule_engine)} categories")
+            # Swap in the compiled rules in one step
+            self._rules = RuleSet(rule_engine, thresholds, automaton)
+            self.cache.clear()
+            
+            print(f"✓ Loaded rules for {len(rule_engine)} categories ({len(automaton)} keywords)")
+            return True
         except Exception as e:
             print(f"❌ Error loading rules: {e}")
+            return False
+    
+    @staticmethod
+    def _file_signature(paths):
+        signature = []
+        for path in paths:
+            try:
+                stat = os.stat(path)
+                signature.append((path, stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                signature.append((path, None, None))
+        return tuple(signature)
+    
+    def _artifacts_complete(self):
+        """False unless the files on disk are the ones the current manifest.json describes (sizes and sha256)"""
+        manifest = read_manifest(self.model_path)
+        if manifest is None:
+            return True
+        return verify_artifacts(self.model_path, manifest)
+    
+    def check_for_updates(self):
+        """
+        Reload whatever changed on disk since it was loaded
+        
+        A taxonomy edit only recompiles the rule automaton; the model is
+        reloaded only when manifest.json changes (save_artifacts replaces it
+        after all other files) and the files match it. New snapshots are
+        swapped in atomically, so in-flight predictions finish on the old one.
+        
+        Returns:
+            List of reloaded parts ('rules', 'model'), empty if nothing changed
+        """
+        reloaded = []
+        with self._reload_lock:
+            if self._file_signature([self.rules_path]) != self._rules_signature:
+                if self.load_rules(self.rules_path):
+                    reloaded.append('rules')
+            
+            if self._file_signature(watch_paths(self.model_path)) != self._model_signature:
+                if self._artifacts_complete():
+                    try:
+                        self.load_model()
+                        reloaded.append('model')
+                    except Exception as e:
+                        print(f"⚠️ Model reload failed, keeping current model: {e}")
+        
+        return reloaded
+    
+    def start_watching(self, interval=2.0):
+        """Poll config and model files in a background thread and hot-swap changes"""
+        if self._watcher is not None and self._watcher.is_alive():
+            return
+        
+        def watch():
+            while not self._stop_watching.wait(interval):
+                try:
+                    reloaded = self.check_for_updates()
+                    if reloaded:
+                        print(f"✓ Hot-reloaded: {', '.join(reloaded)}")
+                except Exception as e:
+                    print(f"⚠️ Reload check failed: {e}")
+        
+        self._stop_watching.clear()
+        self._watcher = threading.Thread(target=watch, name='predictor-watcher', daemon=True)
+        self._watcher.start()
+    
+    def stop_watching(self):
+        """Stop the background watcher thread"""
+        self._stop_watching.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
+    
+    def _check_artifacts(self):
+        """Request-path reload check (rate limited, skipped while a watcher thread runs)"""
+        if self._watcher is not None:
+            return
+        now = time.monotonic()
+        if now - self._last_artifact_check < self.cache_check_interval:
+            return
+        self._last_artifact_check = now
+        self.check_for_updates()
+    
+    def cache_stats(self):
+        """Hit/miss counters of the prediction cache"""
+        return self.cache.stats()
     
     def preprocess_text(self, text):
-        """Clean and normalize transaction text"""
-        if pd.isna(text):
-            return ""
-        text = str(text).lower().strip()
-        text = text.replace('*', '').replace('#', '')
-        return text
-    
-    def rule_match(self, text):
+        """Clean and normalize transaction text (shared with training, see normalize.py)"""
+        return normalize_text(text)
+
+    def preprocess_series(self, texts):
+        """Vectorized preprocess_text over a whole column"""
+        return normalize_series(texts)
+    
+    def rule_match(self, text, rules=None):
         """Check if transaction matches any keyword rules"""
-        text_lower = text.lower()
-        
-        for category, keywords in self.rule_engine.items():
-            for keyword in keywords:
-                # Simple substring match - can be improved with regex boundaries
-                if keyword in text_lower:
-                    return {
-                        'category': category,
-                        'confidence': 0.95,
-                        'method': 'rule_match',
-                        'matched_keyword': keyword
-                    }
+        match = (rules or self._rules).automaton.search(text)
+        
+        if match:
+            category, keyword = match
+            return {
+                'category': category,
+                'confidence': 0.95,
+                'method': 'rule_match',
+                'matched_keyword': keyword
+            }
         
         return None
     
-    def ml_predict(self, text):
-        """Use ML model for prediction"""
-        text_vec = self.vectorizer.transform([text])
+    def rule_match_batch(self, texts, rules=None):
+        """
+        Run the rule engine over a whole column of preprocessed texts
         
-        # Get prediction and probabilities
-        category = self.model.predict(text_vec)[0]
-        probabilities = self.model.predict_proba(text_vec)[0]
+        Each distinct text is scanned once by the keyword automaton and the
+        result is fanned back out to every row that shares it.
+        
+        Returns:
+            (categories, keywords) object arrays, None where no rule matched
+        """
+        automaton = (rules or self._rules).automaton
+        codes, uniques = pd.factorize(pd.Series(texts, dtype=object))
         
-        # Get confidence for predicted category
-        category_idx = list(self.categories).index(category)
-        confidence = probabilities[category_idx]
+        unique_categories = np.full(len(uniques) + 1, None, dtype=object)
+        unique_keywords = np.full(len(uniques) + 1, None, dtype=object)
+        for idx, text in enumerate(uniques):
+            match = automaton.search(text)
+            if match:
+                unique_categories[idx], unique_keywords[idx] = match
         
+        # factorize marks missing values with -1, which lands on the trailing None
+        return unique_categories[codes], unique_keywords[codes]
+    
+    def _ml_entry(self, text, bundle):
+        """Single inference pass: argmax over one probability row"""
+        probabilities = bundle.predict_proba([text])[0]
+        best = probabilities.argmax()
+        return (bundle.class_labels[best], float(probabilities[best]), None, probabilities)
+    
+    def _score_clean(self, clean_text, bundle, rules):
+        """Rule engine, then ML, for one preprocessed text as a compact cache entry"""
+        rule_result = self.rule_match(clean_text, rules)
+        if rule_result:
+            return (rule_result['category'], rule_result['confidence'], rule_result['matched_keyword'], None)
+        return self._ml_entry(clean_text, bundle)
+    
+    @staticmethod
+    def _cache_key(clean_text, bundle, rules):
+        # Versioned keys: entries written by an in-flight request after a swap can never be read
+        return (bundle.version, rules.version, clean_text)
+    
+    def _entry_to_result(self, entry, categories):
+        """Expand a (category, confidence, keyword, probabilities) entry into a result dict"""
+        category, confidence, keyword, probabilities = entry
+        if keyword is not None:
+            return {
+                'category': category,
+                'confidence': confidence,
+                'method': 'rule_match',
+                'matched_keyword': keyword
+            }
         return {
             'category': category,
-            'confidence': float(confidence),
+            'confidence': confidence,
             'method': 'ml_model',
-            'probabilities': {cat: float(prob) for cat, prob in zip(self.categories, probabilities)}
+            'probabilities': {cat: float(prob) for cat, prob in zip(categories, probabilities)}
         }
     
-    def predict(self, transaction_text, explain=False):
+    def ml_predict(self, text):
+        """Use ML model for prediction"""
+        bundle = self._bundle
+        return self._entry_to_result(self._ml_entry(text, bundle), bundle.categories)
+    
+    def ml_predict_batch(self, texts, bundle=None):
+        """
+        Use ML model for many texts at once
+        
+        One sparse transform and one predict_proba call for the whole batch.
+        
+        Returns:
+            (categories, confidences, probabilities) arrays
+        """
+        bundle = bundle or self._bundle
+        probabilities = bundle.predict_proba(texts)
+        
+        best = probabilities.argmax(axis=1)
+        categories = bundle.class_labels[best]
+        confidences = probabilities[np.arange(len(best)), best]
+        
+        return categories, confidences, probabilities
+    
+    def predict(self, transaction_text, explain=False, explain_mode='lime'):
         """
         Predict category for a transaction
         
         Args:
             transaction_text: Raw transaction description
-            explain: If True, include LIME explanation
+            explain: If True, include an explanation
+            explain_mode: 'lime' (full LIME) or 'linear' (TF-IDF x coefficients, no sampling)
         
         Returns:
             Dictionary with prediction details
         """
+        self._check_artifacts()
+        bundle, rules = self._bundle, self._rules
         clean_text = self.preprocess_text(transaction_text)
         
-        # Try rule matching first
-        rule_result = self.rule_match(clean_text)
-        
-        if rule_result:
-            result = rule_result
+        override = self.feedback.get(clean_text)
+        if override is not None:
+            # A reviewer already corrected this exact description
+            result = {'category': override, 'confidence': 1.0, 'method': 'feedback'}
         else:
-            # Fall back to ML model
-            result = self.ml_predict(clean_text)
+            # Rule matching first, then ML fallback; repeated descriptions hit the cache
+            cache_key = self._cache_key(clean_text, bundle, rules)
+            entry = self.cache.get(cache_key)
+            if entry is None:
+                entry = self._score_clean(clean_text, bundle, rules)
+                self.cache.put(cache_key, entry)
+            result = self._entry_to_result(entry, bundle.categories)
         
         result['original_text'] = transaction_text
         result['needs_review'] = result['confidence'] < 0.7
         
         # Add explanation if requested
-        if explain and result['method'] == 'ml_model' and self.explainer:
-            result['explanation'] = self.explain_prediction(clean_text)
+        if explain and result['method'] == 'ml_model' and bundle.explainer:
+            result['explanation'] = self.explain_prediction(clean_text, mode=explain_mode, bundle=bundle)
         
         return result
     
-    def explain_prediction(self, text, num_features=5):
-        """Generate explanation for ML prediction using LIME"""
-        def predict_proba_wrapper(texts):
-            vec = self.vectorizer.transform(texts)
-            return self.model.predict_proba(vec)
+    def explain_prediction(self, text, num_features=5, mode='lime', num_samples=5000, bundle=None):
+        """
+        Generate explanation for ML prediction
+        
+        Args:
+            text: Preprocessed transaction text
+            num_features: Number of top words to return
+            mode: 'lime' for LIME, 'linear' for the linear model's TF-IDF contributions
+            num_samples: LIME perturbations (fewer is faster and rougher)
+        """
+        bundle = bundle or self._bundle
+        if mode == 'linear':
+            category = self._ml_entry(text, bundle)[0]
+            return self.explain_linear_batch([text], [category], num_features, bundle=bundle)[0]
         
         try:
-            exp = self.explainer.explain_instance(
+            exp = bundle.explainer.explain_instance(
                 text, 
-                predict_proba_wrapper,
+                bundle.predict_proba,
                 num_features=num_features,
-                top_labels=1
+                top_labels=1,
+                num_samples=num_samples
             )
             
             # Get top contributing words
@@ -157,65 +647,534 @@ class TransactionPredictor:
             
             return {
                 'top_words': word_weights,
-                'predicted_class': self.categories[top_label]
+                'predicted_class': bundle.categories[top_label]
             }
         except Exception as e:
             return {'error': str(e)}
     
-    def batch_predict(self, transactions, show_progress=True):
+    def explain_linear_batch(self, texts, categories, num_features=5, bundle=None):
+        """
+        Approximate explanations for many texts without LIME sampling
+        
+        Each word's weight is its TF-IDF value times the linear model's
+        coefficient for the predicted category, i.e. its contribution to
+        that class's logit. One sparse transform covers the whole batch.
+        
+        Args:
+            texts: Preprocessed transaction texts
+            categories: Category to explain for each text
+            num_features: Number of top words per text
+        
+        Returns:
+            List of explanation dicts in the explain_prediction format
+        """
+        bundle = bundle or self._bundle
+        if bundle.linear_coef is None:
+            return [{'error': 'No linear model component to explain with'} for _ in texts]
+        
+        text_vec = bundle.vectorizer.transform(texts).tocsr()
+        lookup = {cat: idx for idx, cat in enumerate(bundle.categories)}
+        category_rows = np.array([lookup[cat] for cat in categories], dtype=int)
+        
+        # Contribution of every non-zero feature, all rows at once
+        row_lengths = np.diff(text_vec.indptr)
+        contributions = text_vec.data * bundle.linear_coef[np.repeat(category_rows, row_lengths), text_vec.indices]
+        
+        explanations = []
+        for row, category in enumerate(categories):
+            start, end = text_vec.indptr[row], text_vec.indptr[row + 1]
+            weights = contributions[start:end]
+            top = np.argsort(-np.abs(weights))[:num_features]
+            names = bundle.feature_names_for(texts[row])
+            explanations.append({
+                'top_words': [(names[text_vec.indices[start + i]], float(weights[i])) for i in top],
+                'predicted_class': category,
+                'method': 'linear'
+            })
+        
+        return explanations
+    
+    def batch_predict(self, transactions, show_progress=True, as_dataframe=False, explain=None,
+                      num_features=5, as_arrow=False):
         """
         Predict categories for multiple transactions
         
+        The whole column is preprocessed at once and identical descriptions
+        are deduplicated. Distinct texts are rule-matched, cached ML results
+        are reused, and the remaining rule misses go through a single
+        vectorized ML call before results are fanned back out per row.
+        
         Args:
-            transactions: List of transaction texts or DataFrame
+            transactions: List of transaction texts, DataFrame or Arrow table
             show_progress: Show progress during processing
+            as_dataframe: Return a DataFrame instead of a BatchResult
+            as_arrow: Return a typed Arrow table (see BatchResult.to_arrow)
+            explain: None, 'low_confidence' (ML rows needing review) or 'all' (every ML row)
+                to attach fast linear explanations
+            num_features: Top words per explanation
         
         Returns:
-            List of prediction results
+            BatchResult: columnar predictions that render prediction dicts lazily
+            on indexing/iteration (DataFrame if as_dataframe=True, Arrow table if as_arrow=True)
         """
-        if isinstance(transactions, pd.DataFrame):
+        if pa is not None and isinstance(transactions, (pa.Table, pa.RecordBatch)):
+            if 'description' not in transactions.schema.names:
+                raise ValueError("Arrow table must have 'description' column")
+            originals = transactions.column('description').to_pandas().astype(object)
+        elif isinstance(transactions, pd.DataFrame):
             if 'description' not in transactions.columns:
                 raise ValueError("DataFrame must have 'description' column")
-            transaction_list = transactions['description'].tolist()
+            originals = transactions['description'].reset_index(drop=True)
         else:
-            transaction_list = transactions
+            originals = pd.Series(list(transactions), dtype=object)
         
-        results = []
         start_time = time.time()
+        n = len(originals)
+        self._check_artifacts()
+        # The whole batch runs on one model/rules snapshot, even if a reload happens meanwhile
+        bundle, rules = self._bundle, self._rules
+        
+        # Score each distinct description once and fan results back out
+        clean = self.preprocess_series(originals)
+        codes, uniques = pd.factorize(clean)
+        
+        # Reviewer overrides, then the rule engine, over the distinct texts
+        u_overrides = self.feedback.lookup(uniques)
+        u_is_override = pd.notna(u_overrides)
+        u_categories, u_keywords = self.rule_match_batch(uniques, rules)
+        u_keywords[u_is_override] = None
+        u_categories[u_is_override] = u_overrides[u_is_override]
+        u_is_rule = pd.notna(u_keywords)
+        u_is_ml = ~(u_is_rule | u_is_override)
+        u_confidences = np.select([u_is_override, u_is_rule], [1.0, 0.95], np.nan)
+        u_probabilities = None
+        
+        if show_progress:
+            print(f"Rule engine matched {int(u_is_rule[codes].sum())}/{n} transactions ({len(uniques)} distinct)...")
+            if u_is_override.any():
+                print(f"Reviewer overrides applied to {int(u_is_override[codes].sum())} transactions...")
         
-        for idx, text in enumerate(transaction_list):
-            result = self.predict(text)
-            results.append(result)
+        # Cached ML results first, then one vectorized ML pass over the rest
+        ml_uniques = np.flatnonzero(u_is_ml)
+        if len(ml_uniques):
+            u_probabilities = np.full((len(uniques), len(bundle.categories)), np.nan)
+            to_score = []
+            for u in ml_uniques:
+                entry = self.cache.get(self._cache_key(uniques[u], bundle, rules)) if self.cache.max_size > 0 else None
+                if entry is None:
+                    to_score.append(u)
+                else:
+                    u_categories[u], u_confidences[u], _, u_probabilities[u] = entry
             
-            if show_progress and (idx + 1) % 100 == 0:
-                print(f"Processed {idx + 1}/{len(transaction_list)} transactions...")
+            if to_score:
+                to_score = np.asarray(to_score)
+                ml_categories, ml_confidences, probabilities = self.ml_predict_batch(uniques[to_score], bundle)
+                u_categories[to_score] = ml_categories
+                u_confidences[to_score] = ml_confidences
+                u_probabilities[to_score] = probabilities
+                if self.cache.max_size > 0:
+                    for u, category, confidence, row in zip(to_score, ml_categories, ml_confidences, probabilities):
+                        self.cache.put(self._cache_key(uniques[u], bundle, rules), (category, float(confidence), None, row.copy()))
+        
+        # Fast linear explanations, computed once per distinct text
+        u_explanations = {}
+        if explain:
+            if explain not in ('low_confidence', 'all'):
+                raise ValueError("explain must be None, 'low_confidence' or 'all'")
+            explain_mask = u_is_ml.copy()
+            if explain == 'low_confidence':
+                explain_mask &= u_confidences < 0.7
+            explain_uniques = np.flatnonzero(explain_mask)
+            if len(explain_uniques):
+                explanations = self.explain_linear_batch(
+                    uniques[explain_uniques], u_categories[explain_uniques], num_features, bundle
+                )
+                u_explanations = dict(zip(explain_uniques.tolist(), explanations))
+        
+        # Columnar result: codes into small label tables, fanned out per row
+        labels = list(bundle.categories)
+        labels += sorted(set(u_categories[~u_is_ml].tolist()) - set(labels))
+        u_category_codes = pd.Categorical(u_categories, categories=labels).codes.astype(np.int32)
+        u_method_codes = np.select(
+            [u_is_override, u_is_rule], [Method.FEEDBACK, Method.RULE_MATCH], Method.ML_MODEL
+        ).astype(np.int8)
+        u_keyword_codes, keyword_labels = pd.factorize(pd.Series(u_keywords, dtype=object))
+        
+        results = BatchResult(
+            categories=labels,
+            category_codes=u_category_codes[codes],
+            confidence=u_confidences.astype(np.float32)[codes],
+            method_codes=u_method_codes[codes],
+            keywords=keyword_labels,
+            keyword_codes=u_keyword_codes.astype(np.int32)[codes],
+            # Thresholded before the float32 cast so it matches predict()
+            needs_review=(u_confidences < 0.7)[codes],
+            original_text=originals.to_numpy(dtype=object),
+            probabilities=None if u_probabilities is None else u_probabilities.astype(np.float32)[codes],
+            probability_columns=bundle.categories,
+            explanations=u_explanations,
+            explanation_codes=codes if explain else None
+        )
+        if as_arrow:
+            results = results.to_arrow()
+        elif as_dataframe:
+            results = results.to_dataframe()
         
         elapsed = time.time() - start_time
-        throughput = len(transaction_list) / elapsed if elapsed > 0 else 0
+        throughput = n / elapsed if elapsed > 0 else 0
         
-        print(f"\n✓ Batch prediction complete!")
-        print(f"  Total transactions: {len(transaction_list)}")
-        print(f"  Time elapsed: {elapsed:.2f}s")
-        print(f"  Throughput: {throughput:.0f} transactions/second")
+        if show_progress:
+            print(f"\n✓ Batch prediction complete!")
+            print(f"  Total transactions: {n}")
+            print(f"  Time elapsed: {elapsed:.2f}s")
+            print(f"  Throughput: {throughput:.0f} transactions/second")
         
         return results
     
+    def stream_predict(self, input_file, output_path, chunk_size=50000, show_progress=True, columns=None,
+                       progress_callback=None, cancel_event=None):
+        """
+        Categorize a CSV or Parquet file chunk by chunk with bounded memory
+        
+        Each chunk is scored with batch_predict, appended to output_path
+        (CSV, or typed Parquet if the path ends in .parquet) and folded into
+        running statistics, so peak memory depends on chunk_size only.
+        
+        Args:
+            input_file: CSV/Parquet path or file-like object with a 'description' column
+            output_path: Where to write input columns plus predictions
+            chunk_size: Rows per chunk
+            show_progress: Print progress per chunk
+            columns: Input columns to read and keep (default: all); ['description'] reads only that column
+            progress_callback: Called after every chunk with the running statistics (including throughput)
+            cancel_event: threading.Event checked before every chunk; once set, the rows
+                scored so far are kept and the statistics are returned with cancelled=True
+        
+        Returns:
+            Statistics dictionary (same keys as get_statistics) plus timing
+        """
+        start_time = time.time()
+        stats = StreamingStatistics()
+        cancelled = False
+        
+        with ResultWriter(output_path) as writer:
+            for chunk in iter_transaction_chunks(input_file, chunk_size, columns):
+                if cancel_event is not None and cancel_event.is_set():
+                    cancelled = True
+                    break
+                
+                results = self.batch_predict(chunk['description'], show_progress=False)
+                results_df = results.to_dataframe()
+                results_df.index = chunk.index
+                writer.write(merge_predictions(chunk, results_df))
+                stats.update(results)
+                
+                if show_progress:
+                    print(f"Processed {stats.total} transactions...")
+                if progress_callback is not None:
+                    progress_callback(stats.to_dict(elapsed=time.time() - start_time))
+        
+        result = stats.to_dict(elapsed=time.time() - start_time)
+        result['cancelled'] = cancelled
+        return result
+    
     def get_statistics(self, results):
-        """Calculate statistics from prediction results"""
-        df = pd.DataFrame(results)
+        """Calculate statistics from prediction results (BatchResult, DataFrame or list of dicts)"""
+        stats = StreamingStatistics()
+        stats.update(results if isinstance(results, (BatchResult, pd.DataFrame)) else pd.DataFrame(results))
+        return stats.to_dict()
+
+class StreamingStatistics:
+    """Batch statistics maintained incrementally, one result chunk at a time"""
+    
+    def __init__(self, review_threshold=0.7, max_samples=10):
+        self.review_threshold = review_threshold
+        self.max_samples = max_samples
+        self.total = 0
+        self.rule_matches = 0
+        self.ml_predictions = 0
+        self.feedback_overrides = 0
+        self.needs_review = 0
+        self.confidence_sum = 0.0
+        self.category_counts = {}
+        self.low_confidence_samples = []
+    
+    def update(self, results):
+        """Fold a BatchResult or DataFrame of prediction results into the running totals"""
+        if len(results) == 0:
+            return
+        if isinstance(results, BatchResult):
+            self._update_columnar(results)
+            return
+        
+        self.total += len(results)
+        self.rule_matches += int((results['method'] == 'rule_match').sum())
+        self.ml_predictions += int((results['method'] == 'ml_model').sum())
+        self.feedback_overrides += int((results['method'] == 'feedback').sum())
+        self.needs_review += int((results['needs_review'] == True).sum())
+        self.confidence_sum += float(results['confidence'].to_numpy(dtype=np.float64).sum())
+        
+        for category, count in results['category'].value_counts().items():
+            self.category_counts[category] = self.category_counts.get(category, 0) + int(count)
+        
+        missing = self.max_samples - len(self.low_confidence_samples)
+        if missing > 0:
+            low = results[results['confidence'] < self.review_threshold]
+            self.low_confidence_samples.extend(
+                low[['original_text', 'category', 'confidence']].head(missing).to_dict('records')
+            )
+    
+    def _update_columnar(self, results):
+        """update() straight from the BatchResult arrays, no per-row objects"""
+        self.total += len(results)
+        method_counts = np.bincount(results.method_codes, minlength=len(Method))
+        self.rule_matches += int(method_counts[Method.RULE_MATCH])
+        self.ml_predictions += int(method_counts[Method.ML_MODEL])
+        self.feedback_overrides += int(method_counts[Method.FEEDBACK])
+        self.needs_review += int(results.needs_review.sum())
+        self.confidence_sum += float(results.confidence.sum(dtype=np.float64))
+        
+        category_counts = np.bincount(results.category_codes, minlength=len(results.categories))
+        for code in np.flatnonzero(category_counts):
+            category = results.categories[code]
+            self.category_counts[category] = self.category_counts.get(category, 0) + int(category_counts[code])
         
+        missing = self.max_samples - len(self.low_confidence_samples)
+        if missing > 0:
+            for row in np.flatnonzero(results.confidence < self.review_threshold)[:missing]:
+                self.low_confidence_samples.append({
+                    'original_text': results.original_text[row],
+                    'category': results.categories[results.category_codes[row]],
+                    'confidence': float(results.confidence[row])
+                })
+    
+    def to_dict(self, elapsed=None):
+        """Statistics in the get_statistics format, with timing if elapsed is given"""
         stats = {
-            'total_predictions': len(results),
-            'rule_matches': len(df[df['method'] == 'rule_match']),
-            'ml_predictions': len(df[df['method'] == 'ml_model']),
-            'needs_review': len(df[df['needs_review'] == True]),
-            'avg_confidence': df['confidence'].mean(),
-            'category_distribution': df['category'].value_counts().to_dict(),
-            'low_confidence_samples': df[df['confidence'] < 0.7][['original_text', 'category', 'confidence']].to_dict('records')[:10]
+            'total_predictions': self.total,
+            'rule_matches': self.rule_matches,
+            'ml_predictions': self.ml_predictions,
+            'feedback_overrides': self.feedback_overrides,
+            'needs_review': self.needs_review,
+            'avg_confidence': self.confidence_sum / self.total if self.total else float('nan'),
+            'category_distribution': dict(sorted(self.category_counts.items(), key=lambda x: x[1], reverse=True)),
+            'low_confidence_samples': list(self.low_confidence_samples)
         }
         
+        if elapsed is not None:
+            stats['elapsed_seconds'] = elapsed
+            stats['throughput'] = self.total / elapsed if elapsed > 0 else 0
+        
         return stats
 
+class ResultWriter:
+    """Append scored chunks to a CSV or Parquet file, chosen by extension"""
+    
+    def __init__(self, output_path):
+        self.output_path = output_path
+        self.format = 'parquet' if is_parquet(output_path) else 'csv'
+        self.rows_written = 0
+        self._parquet_writer = None
+        
+        if self.format == 'parquet' and pa is None:
+            raise ImportError("Parquet output requires pyarrow. Install it with `pip install pyarrow`")
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+    
+    def write(self, df):
+        """Append one chunk of results"""
+        if self.format == 'csv':
+            df.to_csv(
+                self.output_path,
+                mode='w' if self.rows_written == 0 else 'a',
+                header=self.rows_written == 0,
+                index=False
+            )
+        else:
+            table = to_arrow(df)
+            if self._parquet_writer is None:
+                self._parquet_writer = pq.ParquetWriter(self.output_path, table.schema)
+            else:
+                table = table.cast(self._parquet_writer.schema)
+            self._parquet_writer.write_table(table)
+        
+        self.rows_written += len(df)
+    
+    def close(self):
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+            self._parquet_writer = None
+
+PREDICTION_COLUMNS = ['category', 'confidence', 'method', 'matched_keyword', 'needs_review']
+
+# Low-cardinality result columns, stored as Arrow dictionaries
+DICTIONARY_COLUMNS = ['category', 'method', 'matched_keyword']
+
+def is_parquet(path_or_file):
+    """Parquet by extension, for paths and uploaded file objects with a name"""
+    name = path_or_file if isinstance(path_or_file, (str, os.PathLike)) else getattr(path_or_file, 'name', '')
+    return str(name).endswith(('.parquet', '.pq'))
+
+def to_arrow(results):
+    """
+    Typed Arrow table for a DataFrame of prediction results
+    
+    category, method and matched_keyword are dictionary-encoded, confidence
+    and prob_* columns are float32 and other text columns are strings, so
+    every chunk of a file gets the same schema. The table can be handed to
+    Arrow-native tools (pyarrow.compute, DuckDB, Polars) without a copy.
+    """
+    if pa is None:
+        raise ImportError("Arrow output requires pyarrow. Install it with `pip install pyarrow`")
+    
+    arrays = []
+    for col in results.columns:
+        values = results[col]
+        if col in DICTIONARY_COLUMNS:
+            array = pa.array(values.to_numpy(dtype=object), type=pa.string(), from_pandas=True).dictionary_encode()
+        elif col == 'confidence' or col.startswith('prob_'):
+            array = pa.array(values.to_numpy(dtype=np.float32))
+        elif values.dtype == object:
+            if pd.api.types.infer_dtype(values, skipna=True) not in ('string', 'empty'):
+                # Nested values such as explanations are stored as JSON text
+                values = values.map(lambda value: None if value is None else json.dumps(value, default=str))
+            array = pa.array(values, type=pa.string(), from_pandas=True)
+        else:
+            array = pa.array(values, from_pandas=True)
+        arrays.append(array)
+    
+    return pa.Table.from_arrays(arrays, names=[str(col) for col in results.columns])
+
+def iter_transaction_chunks(input_file, chunk_size=50000, columns=None):
+    """
+    Yield DataFrame chunks of a transactions CSV or Parquet file, checking for 'description'
+    
+    columns limits the input columns that are read; for Parquet only those
+    column chunks are decoded at all. CSV columns are read as text: pandas
+    would infer each chunk's dtypes separately (an empty column as float64,
+    amounts as int64 until a chunk has decimals), which breaks the single
+    schema of a Parquet output file.
+    """
+    if is_parquet(input_file):
+        if pq is None:
+            raise ImportError("Parquet input requires pyarrow. Install it with `pip install pyarrow`")
+        parquet_file = pq.ParquetFile(input_file)
+        if 'description' not in parquet_file.schema_arrow.names:
+            raise ValueError("Parquet file must have 'description' column")
+        for batch in parquet_file.iter_batches(batch_size=chunk_size, columns=columns):
+            yield batch.to_pandas()
+        return
+    
+    for chunk in pd.read_csv(input_file, chunksize=chunk_size, usecols=columns, dtype=str):
+        if 'description' not in chunk.columns:
+            raise ValueError("CSV must have 'description' column")
+        yield chunk
+
+def count_transactions(input_file):
+    """
+    Number of rows in a CSV or Parquet file, for progress reporting
+    
+    Parquet reads the count from the file metadata; CSV counts lines, so
+    descriptions with embedded newlines make it an estimate.
+    """
+    if is_parquet(input_file):
+        if pq is None:
+            raise ImportError("Parquet input requires pyarrow. Install it with `pip install pyarrow`")
+        return pq.ParquetFile(input_file).metadata.num_rows
+    
+    lines = 0
+    last = b'\n'
+    with open(input_file, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            lines += block.count(b'\n')
+            last = block[-1:]
+    # Header line out, unterminated last line in
+    return max(lines - 1 + (last != b'\n'), 0)
+
+def merge_predictions(chunk, results):
+    """Input columns plus prediction columns; predictions replace same-named inputs (e.g. a labelled 'category')"""
+    return chunk.drop(columns=PREDICTION_COLUMNS, errors='ignore').join(results[PREDICTION_COLUMNS])
+
+# Per-process predictor used by parallel_batch_predict workers
+_worker_predictor = None
+
+def _init_worker(model_path):
+    """Load model and rules once per worker process"""
+    global _worker_predictor
+    _worker_predictor = TransactionPredictor(model_path=model_path)
+
+def _score_chunk(descriptions):
+    """Score one shard of descriptions inside a worker"""
+    results = _worker_predictor.batch_predict(descriptions, show_progress=False, as_dataframe=True)
+    return results[PREDICTION_COLUMNS + ['original_text']]
+
+def parallel_batch_predict(input_path, output_path, n_workers=None, chunk_size=50000,
+                           model_path='models/', show_progress=True, columns=None):
+    """
+    Score a large CSV or Parquet file in parallel shards
+    
+    The input is read in chunks of chunk_size rows and each chunk is scored
+    by a process pool whose workers load the model once. Only a bounded
+    number of chunks is in flight at a time, and chunks are written to
+    output_path in input order while statistics are updated incrementally.
+    
+    Args:
+        input_path: CSV or Parquet file with a 'description' column
+        output_path: CSV or .parquet file to write input columns plus predictions to
+        n_workers: Worker processes (defaults to all cores)
+        chunk_size: Rows per shard
+        model_path: Directory with trained model files
+        show_progress: Print progress per chunk
+        columns: Input columns to read and keep (default: all)
+    
+    Returns:
+        Statistics dictionary (same keys as get_statistics) plus timing
+    """
+    n_workers = n_workers or os.cpu_count() or 1
+    max_pending = n_workers * 2
+    
+    start_time = time.time()
+    stats = StreamingStatistics()
+    
+    with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker,
+                             initargs=(model_path,)) as pool, ResultWriter(output_path) as writer:
+        pending = deque()
+        
+        def write_next():
+            chunk, future = pending.popleft()
+            results = future.result()
+            results.index = chunk.index
+            writer.write(merge_predictions(chunk, results))
+            stats.update(results)
+            if show_progress:
+                print(f"Processed {stats.total} transactions...")
+        
+        for chunk in iter_transaction_chunks(input_path, chunk_size, columns):
+            pending.append((chunk, pool.submit(_score_chunk, chunk['description'].tolist())))
+            if len(pending) >= max_pending:
+                write_next()
+        
+        while pending:
+            write_next()
+    
+    summary = stats.to_dict(elapsed=time.time() - start_time)
+    summary['workers'] = n_workers
+    
+    if show_progress:
+        print(f"\n✓ Parallel batch prediction complete!")
+        print(f"  Total transactions: {summary['total_predictions']}")
+        print(f"  Workers: {n_workers}")
+        print(f"  Time elapsed: {summary['elapsed_seconds']:.2f}s")
+        print(f"  Throughput: {summary['throughput']:.0f} transactions/second")
+        print(f"  Needs review: {summary['needs_review']}")
+        print(f"  Results saved to {output_path}")
+    
+    return summary
+
 def demo():
     """Quick demo of the prediction system"""
     print("=" * 60)
@@ -257,5 +1216,36 @@ def demo():
         print(f"\n❌ Error running demo: {e}")
         print("Tip: Run 'python train.py' first to train the model.")
 
+def main():
+    """Command-line entry point: demo by default, headless batch scoring with --input"""
+    parser = argparse.ArgumentParser(description="AI Transaction Categorizer - prediction")
+    parser.add_argument('--input', help="CSV or Parquet file with a 'description' column to score")
+    parser.add_argument('--output', default='outputs/predictions.csv', help="Where to write results (.csv or .parquet)")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument('--chunk-size', type=int, default=50000, help="Rows per shard")
+    parser.add_argument('--model-path', default='models/', help="Directory with trained model files")
+    parser.add_argument('--columns', nargs='+', help="Input columns to read and keep (default: all)")
+    args = parser.parse_args()
+    
+    if args.input is None:
+        demo()
+        return
+    
+    output_dir = os.path.dirname(args.output)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    
+    # 'description' is always needed for scoring
+    columns = list(dict.fromkeys(['description'] + args.columns)) if args.columns else None
+    
+    parallel_batch_predict(
+        args.input,
+        args.output,
+        n_workers=args.workers,
+        chunk_size=args.chunk_size,
+        model_path=args.model_path,
+        columns=columns
+    )
+
 if __name__ == "__main__":
-    demo()
\ No newline at end of file
+    main()
\ No newline at end of file
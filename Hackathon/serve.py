@@ -0,0 +1,206 @@
+import argparse
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import List
+
+from fastapi import FastAPI, HTTPException
+from pydantic import BaseModel
+
+from predict import TransactionPredictor
+
+
+class PredictRequest(BaseModel):
+    description: str
+
+
+class BatchPredictRequest(BaseModel):
+    descriptions: List[str]
+
+
+class FeedbackRequest(BaseModel):
+    description: str
+    category: str
+
+
+class MicroBatcher:
+    """
+    Collect concurrent requests into one vectorized batch_predict call
+
+    Requests are queued; the batching loop takes the first waiting request,
+    then keeps collecting until max_batch_size descriptions are queued or
+    max_wait_ms has passed. The combined batch is scored on a single worker
+    thread and each request gets its own slice of the results back.
+    """
+
+    def __init__(self, predictor, max_batch_size=256, max_wait_ms=5):
+        self.predictor = predictor
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue = None
+        self._task = None
+        # One thread: the model is never called concurrently
+        self._executor = ThreadPoolExecutor(max_workers=1)
+
+        self.batches = 0
+        self.requests = 0
+        self.transactions = 0
+
+    async def start(self):
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._executor.shutdown(wait=False)
+
+    async def submit(self, descriptions):
+        """Queue descriptions and wait for their results"""
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((descriptions, future))
+        return await future
+
+    async def call(self, func, *args):
+        """Run func on the scoring thread, so it never overlaps a batch"""
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            pending = [await self._queue.get()]
+            size = len(pending[0][0])
+            deadline = loop.time() + self.max_wait
+
+            while size < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                pending.append(item)
+                size += len(item[0])
+
+            texts = [text for descriptions, _ in pending for text in descriptions]
+            try:
+                results = await loop.run_in_executor(
+                    self._executor,
+                    lambda: self.predictor.batch_predict(texts, show_progress=False)
+                )
+            except Exception as e:
+                for _, future in pending:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            self.batches += 1
+            self.requests += len(pending)
+            self.transactions += len(texts)
+
+            offset = 0
+            for descriptions, future in pending:
+                if not future.done():
+                    future.set_result(results[offset:offset + len(descriptions)].to_dicts())
+                offset += len(descriptions)
+
+    def stats(self):
+        return {
+            'batches': self.batches,
+            'requests': self.requests,
+            'transactions': self.transactions,
+            'avg_batch_size': self.transactions / self.batches if self.batches else 0.0,
+            'queued': self._queue.qsize() if self._queue else 0
+        }
+
+
+def create_app(model_path='models/', max_batch_size=256, max_wait_ms=5):
+    """Build the scoring service around a single preloaded TransactionPredictor"""
+    state = {}
+
+    @asynccontextmanager
+    async def lifespan(app):
+        predictor = TransactionPredictor(model_path=model_path)
+        predictor.start_watching()
+        batcher = MicroBatcher(predictor, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+        await batcher.start()
+        state['predictor'] = predictor
+        state['batcher'] = batcher
+        state['started'] = time.time()
+        yield
+        await batcher.stop()
+        predictor.stop_watching()
+
+    app = FastAPI(title="AI Transaction Categorizer", lifespan=lifespan)
+
+    @app.get('/health')
+    async def health():
+        predictor = state.get('predictor')
+        if predictor is None:
+            raise HTTPException(status_code=503, detail="Model not loaded")
+        return {
+            'status': 'ok',
+            'uptime_seconds': time.time() - state['started'],
+            'categories': len(predictor.categories),
+            'rule_keywords': len(predictor.rule_automaton),
+            'model_created': (predictor.manifest or {}).get('created'),
+            'cache': predictor.cache_stats(),
+            'feedback': predictor.feedback_stats(),
+            'batcher': state['batcher'].stats()
+        }
+
+    @app.post('/predict')
+    async def predict(request: PredictRequest):
+        results = await state['batcher'].submit([request.description])
+        return results[0]
+
+    @app.post('/predict/batch')
+    async def predict_batch(request: BatchPredictRequest):
+        if not request.descriptions:
+            return {'results': []}
+        results = await state['batcher'].submit(request.descriptions)
+        return {'results': results}
+
+    @app.post('/feedback')
+    async def feedback(request: FeedbackRequest):
+        try:
+            return await state['batcher'].call(
+                state['predictor'].record_feedback, request.description, request.category
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+
+    return app
+
+
+# Module-level app for `uvicorn serve:app`; settings come from the environment
+app = create_app(
+    model_path=os.environ.get('MODEL_PATH', 'models/'),
+    max_batch_size=int(os.environ.get('MAX_BATCH_SIZE', 256)),
+    max_wait_ms=float(os.environ.get('MAX_WAIT_MS', 5))
+)
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="AI Transaction Categorizer - HTTP scoring service")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--model-path', default='models/')
+    parser.add_argument('--max-batch-size', type=int, default=256, help="Max transactions per model call")
+    parser.add_argument('--max-wait-ms', type=float, default=5, help="How long to wait for more requests to batch")
+    args = parser.parse_args()
+
+    uvicorn.run(
+        create_app(args.model_path, args.max_batch_size, args.max_wait_ms),
+        host=args.host,
+        port=args.port
+    )
@@ -0,0 +1,215 @@
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+# Categories and the merchants/keywords used for both the data and taxonomy.yaml
+CATEGORIES_CONFIG = {
+    'Coffee/Dining': [
+        'Starbucks', 'Dunkin Donuts', 'McDonalds', 'Subway', 'Pizza Hut',
+        'KFC', 'Dominos', 'Chipotle', 'Panera Bread', 'Cafe Coffee Day',
+        'Local Restaurant', 'Food Court', 'Dinner', 'Lunch'
+    ],
+    'Fuel': [
+        'Shell Gas', 'Chevron', 'BP Station', 'Exxon', 'Indian Oil',
+        'HP Petrol', 'Bharat Petroleum', 'Gas Station', 'Fuel Stop'
+    ],
+    'Groceries': [
+        'Walmart', 'Target', 'Whole Foods', 'Costco', 'Safeway',
+        'BigBasket', 'DMart', 'Reliance Fresh', 'Supermarket', 'Grocery Store'
+    ],
+    'Shopping': [
+        'Amazon', 'Flipkart', 'Myntra', 'AJIO', 'H&M', 'Zara',
+        'Nike Store', 'Adidas', 'Apple Store', 'Best Buy', 'Mall Purchase'
+    ],
+    'Healthcare': [
+        'Apollo Pharmacy', 'CVS Pharmacy', 'Walgreens', 'Medical Center',
+        'Dental Clinic', 'Hospital', 'Lab Test', 'Doctor Visit'
+    ],
+    'Transportation': [
+        'Uber', 'Lyft', 'Ola Cab', 'Metro Card', 'Bus Pass',
+        'Railway Ticket', 'Parking Fee', 'Toll Plaza'
+    ],
+    'Entertainment': [
+        'Netflix', 'Amazon Prime', 'Spotify', 'Movie Theater',
+        'PVR Cinemas', 'Gaming Store', 'Concert Ticket'
+    ],
+    'Utilities': [
+        'Electric Bill', 'Water Bill', 'Internet Bill', 'Phone Bill',
+        'Gas Bill', 'Airtel', 'Jio', 'Vodafone'
+    ],
+    'Education': [
+        'Coursera', 'Udemy', 'Book Store', 'School Fee',
+        'Tuition Payment', 'Online Course', 'Library'
+    ],
+    'Fitness': [
+        'Gym Membership', 'Yoga Studio', 'Sports Equipment',
+        'Fitness Center', 'Swimming Pool'
+    ]
+}
+
+# Rough share of transactions per category in a real card statement
+REALISTIC_CLASS_WEIGHTS = {
+    'Coffee/Dining': 0.22, 'Groceries': 0.18, 'Shopping': 0.15, 'Transportation': 0.12,
+    'Fuel': 0.09, 'Entertainment': 0.07, 'Utilities': 0.06, 'Healthcare': 0.05,
+    'Fitness': 0.03, 'Education': 0.03
+}
+
+# Median amount and lognormal spread per category
+CATEGORY_AMOUNTS = {
+    'Coffee/Dining': (12, 0.6), 'Groceries': (60, 0.7), 'Shopping': (45, 0.9),
+    'Transportation': (15, 0.7), 'Fuel': (40, 0.4), 'Entertainment': (15, 0.6),
+    'Utilities': (70, 0.5), 'Healthcare': (35, 0.9), 'Fitness': (40, 0.5), 'Education': (50, 0.9)
+}
+
+# The original demo noise, used for the training data
+SIMPLE_NOISE = ['', ' Downtown', ' Online', ' Store', ' #123', ' - Purchase']
+
+PAYMENT_PREFIXES = ['SQ *', 'POS ', 'PAYPAL *', 'ACH ', 'TST* ', 'CHECKCARD ']
+CITIES = [
+    'NEW YORK NY', 'SAN FRANCISCO CA', 'SEATTLE WA', 'AUSTIN TX', 'CHICAGO IL',
+    'BOSTON MA', 'MUMBAI', 'BANGALORE', 'DELHI', 'LONDON', 'TORONTO ON', 'SYDNEY'
+]
+
+
+def _number_table(size, template):
+    """Pre-formatted strings for every number below size, so rows only need an index"""
+    return np.array([template.format(i) for i in range(size)], dtype=object)
+
+
+# Component tables: index 0 is the empty string (component left out)
+_PREFIXES = np.array([''] + PAYMENT_PREFIXES, dtype=object)
+_CITIES = np.array([''] + [f' {city}' for city in CITIES], dtype=object)
+_STORE_NUMBERS = np.concatenate([[''], _number_table(10000, ' #{:04d}')[1:]])
+_CARD_SUFFIXES = np.concatenate([[''], _number_table(10000, ' XXXX{:04d}')[1:]])
+_REFERENCES = np.concatenate([[''], _number_table(100000, ' REF{:05d}')[1:]])
+_SIMPLE_NOISE = np.array(SIMPLE_NOISE, dtype=object)
+
+
+def _pick(rng, table, n, probability):
+    """Index into a component table for n rows: a random entry with the given probability, else 0"""
+    indices = rng.integers(1, len(table), n)
+    return np.where(rng.random(n) < probability, indices, 0)
+
+
+def generate_transactions(n_rows, seed=None, class_weights=None, realistic_noise=True,
+                          start_date='2024-01-01', end_date='2025-01-01',
+                          categories_config=None, rng=None):
+    """
+    Generate synthetic transactions with every column drawn at once
+
+    Args:
+        n_rows: Number of transactions
+        seed: Seed for numpy.random.default_rng (ignored if rng is given)
+        class_weights: None for equal category counts, 'realistic' for
+            REALISTIC_CLASS_WEIGHTS, or a {category: weight} dict
+        realistic_noise: Bank-export style descriptions (payment prefixes,
+            upper case, store numbers, cities, card suffixes, references);
+            False gives the simple demo suffixes used for training
+        start_date, end_date: Range for the transaction dates
+        categories_config: {category: [merchants]}, defaults to CATEGORIES_CONFIG
+        rng: Existing numpy Generator, so chunks of one dataset share a stream
+
+    Returns:
+        DataFrame with description, amount, category and date columns
+    """
+    rng = rng if rng is not None else np.random.default_rng(seed)
+    categories_config = categories_config or CATEGORIES_CONFIG
+    categories = np.array(list(categories_config), dtype=object)
+
+    # Categories: exactly balanced by default, sampled when weighted
+    if class_weights is None:
+        cat_idx = rng.permutation(np.resize(np.arange(len(categories)), n_rows))
+    else:
+        weights = REALISTIC_CLASS_WEIGHTS if class_weights == 'realistic' else class_weights
+        p = np.array([weights.get(cat, 0.0) for cat in categories], dtype=float)
+        cat_idx = rng.choice(len(categories), size=n_rows, p=p / p.sum())
+
+    # Merchants: one flat table, offset by each category's first merchant
+    merchants = np.array([m for cat in categories for m in categories_config[cat]], dtype=object)
+    counts = np.array([len(categories_config[cat]) for cat in categories])
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    merchant_idx = starts[cat_idx] + (rng.random(n_rows) * counts[cat_idx]).astype(np.int64)
+
+    if realistic_noise:
+        upper = np.array([m.upper() for m in merchants], dtype=object)
+        names = np.where(rng.random(n_rows) < 0.6, upper[merchant_idx], merchants[merchant_idx])
+        descriptions = (
+            _PREFIXES[_pick(rng, _PREFIXES, n_rows, 0.25)]
+            + names
+            + _STORE_NUMBERS[_pick(rng, _STORE_NUMBERS, n_rows, 0.3)]
+            + _CITIES[_pick(rng, _CITIES, n_rows, 0.4)]
+            + _CARD_SUFFIXES[_pick(rng, _CARD_SUFFIXES, n_rows, 0.2)]
+            + _REFERENCES[_pick(rng, _REFERENCES, n_rows, 0.15)]
+        )
+    else:
+        descriptions = merchants[merchant_idx] + _SIMPLE_NOISE[rng.integers(0, len(_SIMPLE_NOISE), n_rows)]
+
+    # Amounts: lognormal around a per-category median
+    medians = np.array([CATEGORY_AMOUNTS.get(cat, (50, 0.8))[0] for cat in categories], dtype=float)
+    sigmas = np.array([CATEGORY_AMOUNTS.get(cat, (50, 0.8))[1] for cat in categories], dtype=float)
+    amounts = np.round(np.exp(np.log(medians[cat_idx]) + sigmas[cat_idx] * rng.standard_normal(n_rows)), 2)
+
+    # Dates: uniform over the range, second resolution
+    start = np.datetime64(start_date, 's')
+    span = int((np.datetime64(end_date, 's') - start) / np.timedelta64(1, 's'))
+    dates = start + rng.integers(0, span, n_rows).astype('timedelta64[s]')
+
+    return pd.DataFrame({
+        'description': descriptions,
+        'amount': amounts,
+        'category': categories[cat_idx],
+        'date': dates
+    })
+
+
+def write_transactions(output_path, n_rows, chunk_size=1000000, seed=None, show_progress=True, **kwargs):
+    """
+    Generate n_rows transactions straight to a CSV or Parquet file, chunk by chunk
+
+    Only one chunk is in memory at a time; all chunks draw from one seeded
+    Generator, so the same seed and chunk_size reproduce the same file.
+    Extra keyword arguments go to generate_transactions.
+
+    Returns:
+        Rows written per second
+    """
+    # Same CSV/Parquet writer as the batch predictions
+    from predict import ResultWriter
+
+    rng = np.random.default_rng(seed)
+    start_time = time.time()
+    written = 0
+
+    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+    with ResultWriter(output_path) as writer:
+        while written < n_rows:
+            size = min(chunk_size, n_rows - written)
+            writer.write(generate_transactions(size, rng=rng, **kwargs))
+            written += size
+            if show_progress:
+                print(f"  {written}/{n_rows} rows written...")
+
+    elapsed = time.time() - start_time
+    return written / elapsed if elapsed > 0 else 0.0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate synthetic transactions for load tests")
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--output', default='data/synthetic_load.csv', help=".csv or .parquet")
+    parser.add_argument('--chunk-size', type=int, default=1000000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--balanced', action='store_true', help="Equal category counts instead of realistic imbalance")
+    parser.add_argument('--simple-noise', action='store_true', help="Demo-style suffixes instead of bank-export noise")
+    args = parser.parse_args()
+
+    print(f"→ Generating {args.rows} transactions into {args.output}...")
+    rate = write_transactions(
+        args.output, args.rows, chunk_size=args.chunk_size, seed=args.seed,
+        class_weights=None if args.balanced else 'realistic',
+        realistic_noise=not args.simple_noise
+    )
+    print(f"\n✓ Generated {args.rows} transactions ({rate * 60 / 1e6:.1f}M rows/minute)")
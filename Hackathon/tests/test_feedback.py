@@ -0,0 +1,66 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from predict import TransactionPredictor
+from synthetic_data import generate_transactions
+from train import TransactionCategorizer, generate_synthetic_data
+
+
+@pytest.fixture(scope='module')
+def model_dir(tmp_path_factory):
+    """A small ensemble trained in a scratch directory (train.py writes outputs/ relative to cwd)"""
+    root = tmp_path_factory.mktemp('feedback')
+    cwd = os.getcwd()
+    os.chdir(root)
+    try:
+        os.makedirs('outputs')
+        df, _ = generate_synthetic_data(n_samples=1000, seed=1)
+        categorizer = TransactionCategorizer()
+        categorizer.train(df)
+        categorizer.save_model(str(root / 'models'))
+    finally:
+        os.chdir(cwd)
+    return str(root / 'models')
+
+
+@pytest.fixture
+def predictor(model_dir, tmp_path):
+    return TransactionPredictor(model_dir, feedback_path=str(tmp_path / 'feedback.jsonl'))
+
+
+def _categories(predictor, texts):
+    return predictor.batch_predict(pd.Series(texts), show_progress=False, as_dataframe=True)['category'].tolist()
+
+
+def test_corrections_do_not_flip_other_descriptions(predictor):
+    held_out = generate_transactions(400, seed=7, realistic_noise=True)['description'].tolist()
+    held_out.append('bill payment online')
+    before = _categories(predictor, held_out)
+    
+    for i in range(30):
+        predictor.record_feedback(f'payment online {i}', 'Fitness')
+    predictor.record_feedback('ACME MKTPLACE 4471', 'Shopping')
+    
+    assert _categories(predictor, held_out) == before
+    assert predictor.predict('ACME MKTPLACE 4471')['category'] == 'Shopping'
+
+
+def test_correction_publishes_a_new_bundle(predictor):
+    old = predictor._bundle
+    old_coef = np.array(old.linear.coef_)
+    old_intercept = np.array(old.linear.intercept_)
+    
+    update = predictor.record_feedback('Netflix Subscription', 'Fitness')
+    new = predictor._bundle
+    
+    assert update['model_steps'] > 0
+    assert new is not old and new.version != old.version
+    # Requests still holding the old bundle see the model exactly as it was
+    np.testing.assert_array_equal(old.linear.coef_, old_coef)
+    assert not np.array_equal(new.linear.coef_, old_coef)
+    np.testing.assert_array_equal(new.linear.intercept_, old_intercept)
+    assert new.model.estimators_[0] is new.linear
+    assert old.model.estimators_[0] is old.linear
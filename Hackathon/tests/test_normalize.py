@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+
+from normalize import normalize_series, normalize_text
+
+SAMPLES = [
+    'WHOLE\xa0FOODS MARKET',
+    'Shell\xa0Gas',
+    'POS\tSTARBUCKS',
+    'POS\xa0STARBUCKS',
+    'pos starbucks',
+    'CHECKCARD\tSHELL OIL 12345',
+    'ACH\xa0PAYROLL',
+    'SQ *BLUE BOTTLE #0123 SEATTLE WA XXXX1234',
+    'İSTANBUL KEBAP',
+    'Uber\tTrip  London',
+    'TST* Joe Coffee',
+    '   ',
+    '',
+    None,
+    np.nan,
+    12345,
+]
+
+
+def test_series_matches_scalar_on_object_column():
+    series = pd.Series(SAMPLES, dtype=object)
+    assert normalize_series(series).tolist() == [normalize_text(text) for text in series]
+
+
+def test_series_matches_scalar_on_string_dtype():
+    series = pd.Series([text for text in SAMPLES if isinstance(text, str)] + [None], dtype='string')
+    assert normalize_series(series).tolist() == [normalize_text(text) for text in series]
+
+
+def test_prefix_is_stripped_after_any_whitespace():
+    assert normalize_text('POS\tSTARBUCKS') == 'starbucks'
+    assert normalize_text('POS\xa0STARBUCKS') == 'starbucks'
+    assert normalize_text('WHOLE\xa0FOODS MARKET') == 'whole foods market'
+
+
+def test_series_keeps_index():
+    series = pd.Series(['Shell\xa0Gas', 'Shell Gas'], index=[10, 20])
+    result = normalize_series(series)
+    assert list(result.index) == [10, 20]
+    assert result.tolist() == ['shell gas', 'shell gas']
@@ -1,10 +1,10 @@
 import pandas as pd
 import numpy as np
-import pickle
 import yaml
-from sklearn.model_selection import train_test_split, cross_val_score
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import train_test_split, cross_val_score, StratifiedKFold
+from sklearn.feature_extraction.text import TfidfVectorizer, HashingVectorizer, TfidfTransformer
+from sklearn.linear_model import LogisticRegression, SGDClassifier
+from sklearn.pipeline import make_pipeline
 from sklearn.ensemble import RandomForestClassifier, VotingClassifier
 from sklearn.metrics import classification_report, confusion_matrix, f1_score
 import matplotlib.pyplot as plt
@@ -12,42 +12,89 @@ import seaborn as sns
 from datetime import datetime
 import json
 import os
+import io
+import copy
+import time
+import argparse
+import joblib
+from sklearn.base import clone
+from joblib import Parallel, delayed
+from artifacts import save_artifacts
+from feedback_store import FeedbackStore
+from normalize import normalize_text, normalize_series, NORMALIZATION_VERSION
+from synthetic_data import generate_transactions, CATEGORIES_CONFIG
 
-class TransactionCategorizer:
-    def __init__(self):
-        self.vectorizer = TfidfVectorizer(
-            max_features=1000,
-            ngram_range=(1, 2),
-            min_df=2,
-            lowercase=True
+DEFAULT_VECTORIZER_PARAMS = {'max_features': 1000, 'ngram_range': (1, 2), 'min_df': 2}
+
+# Search space for train.py --search; the first entries are the defaults
+VECTORIZER_GRID = [
+    DEFAULT_VECTORIZER_PARAMS,
+    {'max_features': 5000, 'ngram_range': (1, 2), 'min_df': 1},
+    {'max_features': 1000, 'ngram_range': (1, 1), 'min_df': 2},
+    {'analyzer': 'char_wb', 'ngram_range': (2, 4), 'max_features': 5000, 'min_df': 2}
+]
+
+MODEL_GRID = [
+    ('ensemble', {'C': 1.0, 'n_estimators': 100}),
+    ('ensemble', {'C': 10.0, 'n_estimators': 100}),
+    ('lr', {'C': 1.0}),
+    ('lr', {'C': 10.0}),
+    ('rf', {'n_estimators': 100}),
+    ('rf', {'n_estimators': 200, 'max_depth': 30})
+]
+
+def build_vectorizer(params=None):
+    """TF-IDF vectorizer with the given settings (defaults to the production configuration)"""
+    return TfidfVectorizer(lowercase=True, **(params or DEFAULT_VECTORIZER_PARAMS))
+
+def build_model(kind='ensemble', params=None, n_jobs=-1):
+    """
+    Classifier for a model kind: 'ensemble' (LR + RF soft voting), 'lr' or 'rf'
+    
+    Ensemble params: C (for the LR member) and n_estimators / max_depth (RF member).
+    n_jobs sets the RandomForest's tree-building parallelism.
+    """
+    params = dict(params or {})
+    if kind == 'lr':
+        return LogisticRegression(max_iter=1000, random_state=42, class_weight='balanced', **params)
+    if kind == 'rf':
+        return RandomForestClassifier(random_state=42, class_weight='balanced', n_jobs=n_jobs, **params)
+    if kind == 'ensemble':
+        lr = LogisticRegression(max_iter=1000, random_state=42, class_weight='balanced', C=params.pop('C', 1.0))
+        rf = RandomForestClassifier(
+            n_estimators=params.pop('n_estimators', 100), random_state=42, class_weight='balanced',
+            n_jobs=n_jobs, **params
         )
+        return VotingClassifier(estimators=[('lr', lr), ('rf', rf)], voting='soft')
+    raise ValueError(f"Unknown model kind '{kind}'")
+
+class TransactionCategorizer:
+    def __init__(self, vectorizer_params=None, model_kind='ensemble', model_params=None):
+        self.vectorizer = build_vectorizer(vectorizer_params)
         
         # Ensemble model for better accuracy
-        lr = LogisticRegression(max_iter=1000, random_state=42, class_weight='balanced')
-        rf = RandomForestClassifier(n_estimators=100, random_state=42, class_weight='balanced')
-        
-        self.model = VotingClassifier(
-            estimators=[('lr', lr), ('rf', rf)],
-            voting='soft'
-        )
+        self.model = build_model(model_kind, model_params)
         
         self.categories = []
+        # Timestamp of the newest reviewer correction folded into the training data
+        self.feedback_until = None
         
     def preprocess_text(self, text):
-        """Clean and normalize transaction text"""
-        if pd.isna(text):
-            return ""
-        text = str(text).lower().strip()
-        # Remove common noise
-        text = text.replace('*', '').replace('#', '')
-        return text
+        """Clean and normalize transaction text (shared with inference, see normalize.py)"""
+        return normalize_text(text)
     
-    def train(self, df):
-        """Train the model on transaction data"""
+    def train(self, df, feedback=None):
+        """
+        Train the model on transaction data
+        
+        feedback is an optional (DataFrame, timestamp) from load_feedback;
+        the corrections are added to the training split only, so the test
+        metrics stay comparable between runs.
+        """
         print("\n=== Training Transaction Categorizer ===\n")
         
         # Preprocess
-        df['clean_description'] = df['description'].apply(self.preprocess_text)
+        df['clean_description'] = normalize_series(df['description'])
         
         # Store categories
         self.categories = sorted(df['category'].unique())
@@ -62,6 +109,16 @@ class TransactionCategorizer:
             stratify=df['category']
         )
         
+        if feedback is not None and len(feedback[0]):
+            corrections, self.feedback_until = feedback
+            corrections = corrections[corrections['category'].isin(self.categories)]
+            X_train = pd.concat([X_train, normalize_series(corrections['description'])], ignore_index=True)
+            y_train = pd.concat([y_train, corrections['category']], ignore_index=True)
+            print(f"\n✓ Added {len(corrections)} reviewer corrections to the training data")
+        
+        # Kept for post-training steps such as compact model export
+        self.split = (X_train, X_test, y_train, y_test)
+        
         print(f"\nTraining samples: {len(X_train)}")
         print(f"Testing samples: {len(X_test)}")
         
@@ -76,7 +133,7 @@ class TransactionCategorizer:
         
         # Cross-validation
         try:
-            cv_scores = cross_val_score(self.model, X_train_vec, y_train, cv=5, scoring='f1_macro')
+            cv_scores = cross_val_score(self.model, X_train_vec, y_train, cv=5, scoring='f1_macro', n_jobs=-1)
             print(f"\n✓ Cross-validation F1 (macro): {cv_scores.mean():.3f} ± {cv_scores.std():.3f}")
             cv_mean = cv_scores.mean()
             cv_std = cv_scores.std()
@@ -110,6 +167,87 @@ class TransactionCategorizer:
         
         return metrics, X_test, y_test, y_pred
     
+    def search(self, df, vectorizer_grid=None, model_grid=None, cv=5, n_jobs=-1,
+               leaderboard_path='outputs/leaderboard.csv'):
+        """
+        Parallel cross-validated search over vectorizer and model settings
+        
+        Runs on the same training split as train(). Each vectorizer setting
+        is fit once per fold and the vectorized folds are shared by every
+        model candidate, so TF-IDF is never refit per candidate. Both the
+        fold vectorization and the (candidate, fold) fits run in parallel
+        over all cores.
+        
+        Returns:
+            Leaderboard DataFrame sorted by CV F1 (best first)
+        """
+        vectorizer_grid = vectorizer_grid or VECTORIZER_GRID
+        model_grid = model_grid or MODEL_GRID
+        
+        print("\n=== Hyperparameter Search ===\n")
+        clean = normalize_series(df['description'])
+        X_train, _, y_train, _ = train_test_split(
+            clean, df['category'], test_size=0.2, random_state=42, stratify=df['category']
+        )
+        X_train = X_train.to_numpy()
+        y_train = y_train.to_numpy()
+        folds = list(StratifiedKFold(n_splits=cv, shuffle=True, random_state=42).split(X_train, y_train))
+        
+        print(f"→ Vectorizing {len(vectorizer_grid)} settings x {cv} folds...")
+        parallel = Parallel(n_jobs=n_jobs)
+        vectorized = parallel(
+            delayed(_vectorize_fold)(params, X_train[train_idx], X_train[val_idx])
+            for params in vectorizer_grid
+            for train_idx, val_idx in folds
+        )
+        fold_cache = {
+            (v, f): vectorized[v * cv + f] for v in range(len(vectorizer_grid)) for f in range(cv)
+        }
+        
+        n_candidates = len(vectorizer_grid) * len(model_grid)
+        print(f"→ Evaluating {n_candidates} candidates ({n_candidates * cv} fits)...")
+        jobs = [(v, m, f) for v in range(len(vectorizer_grid)) for m in range(len(model_grid)) for f in range(cv)]
+        fold_results = parallel(
+            delayed(_evaluate_fold)(
+                *fold_cache[(v, f)], y_train[folds[f][0]], y_train[folds[f][1]],
+                X_train[folds[f][1]], *model_grid[m]
+            )
+            for v, m, f in jobs
+        )
+        
+        rows = {}
+        for (v, m, _), result in zip(jobs, fold_results):
+            rows.setdefault((v, m), []).append(result)
+        
+        leaderboard = []
+        for (v, m), results in rows.items():
+            kind, params = model_grid[m]
+            results = pd.DataFrame(results)
+            leaderboard.append({
+                'vectorizer': json.dumps(vectorizer_grid[v]),
+                'model': kind,
+                'model_params': json.dumps(params),
+                'cv_f1_macro': results['f1_macro'].mean(),
+                'cv_f1_std': results['f1_macro'].std(),
+                'fit_seconds': results['fit_seconds'].mean(),
+                'single_row_p50_ms': results['single_row_p50_ms'].median(),
+                'batch_rows_per_second': results['batch_rows_per_second'].mean(),
+                'n_features': int(results['n_features'].mean())
+            })
+        
+        leaderboard = pd.DataFrame(leaderboard).sort_values(
+            ['cv_f1_macro', 'single_row_p50_ms'], ascending=[False, True]
+        ).reset_index(drop=True)
+        
+        leaderboard.to_csv(leaderboard_path, index=False)
+        leaderboard.to_json(os.path.splitext(leaderboard_path)[0] + '.json', orient='records', indent=2)
+        
+        print(leaderboard[['model', 'model_params', 'vectorizer', 'cv_f1_macro', 'fit_seconds',
+                           'single_row_p50_ms']].head(10).to_string(index=False))
+        print(f"\n✓ Leaderboard saved to {leaderboard_path}")
+        
+        return leaderboard
+    
     def _plot_confusion_matrix(self, cm, categories):
         """Visualize confusion matrix"""
         plt.figure(figsize=(12, 10))
@@ -124,19 +262,342 @@ class TransactionCategorizer:
         plt.close()
     
     def save_model(self, path='models/'):
-        """Save trained model and vectorizer"""
-        os.makedirs(path, exist_ok=True)
+        """Save trained model and vectorizer as memory-mappable artifacts with a manifest"""
+        # Trees are built on all cores, but predicting a few rows is faster without a thread pool
+        for estimator in [self.model] + list(getattr(self.model, 'estimators_', [])):
+            if isinstance(estimator, RandomForestClassifier):
+                estimator.n_jobs = None
+        
+        manifest = save_artifacts(
+            path, self.model, self.vectorizer, self.categories,
+            extra=self._manifest_extra()
+        )
+        
+        total_bytes = sum(entry['bytes'] for entry in manifest['files'].values())
+        print(f"\n✓ Model saved to {path} (format v{manifest['version']}, {total_bytes / 1024:.0f} KB)")
+
+    def _manifest_extra(self):
+        """Training details predict.py reads back from manifest.json"""
+        extra = {'normalization': NORMALIZATION_VERSION}
+        if self.feedback_until is not None:
+            # Corrections up to here are in the model; predict.py only replays later ones
+            extra['feedback_until'] = self.feedback_until
+        return extra
+
+    def _distill_linear(self, X_train_vec, min_weight=1e-3):
+        """
+        Distill the ensemble into one LogisticRegression
+        
+        Soft targets are reproduced exactly with sample weights: every
+        training row is repeated once per class, labelled with that class
+        and weighted by the ensemble's probability for it.
+        """
+        teacher_proba = self.model.predict_proba(X_train_vec)
+        rows, cols = np.nonzero(teacher_proba >= min_weight)
+        
+        student = LogisticRegression(max_iter=1000, random_state=42)
+        student.fit(
+            X_train_vec[rows],
+            np.asarray(self.model.classes_)[cols],
+            sample_weight=teacher_proba[rows, cols]
+        )
+        return student
+    
+    def build_compact_models(self, X_train, y_train):
+        """Candidate serving models that reuse the fitted vectorizer"""
+        X_train_vec = self.vectorizer.transform(X_train)
+        
+        distilled = self._distill_linear(X_train_vec)
+        
+        # float32 coefficients: half the size, same predictions to ~1e-7
+        quantized = copy.deepcopy(distilled)
+        quantized.coef_ = distilled.coef_.astype(np.float32)
+        quantized.intercept_ = distilled.intercept_.astype(np.float32)
+        
+        shallow_forest = RandomForestClassifier(
+            n_estimators=20, max_depth=12, random_state=42, class_weight='balanced', n_jobs=-1
+        ).fit(X_train_vec, y_train)
+        # Benchmarked and served like the main forest: no thread pool for a few rows
+        shallow_forest.n_jobs = None
+        
+        models = {
+            'full_ensemble': self.model,
+            'distilled_linear': distilled,
+            'distilled_linear_float32': quantized,
+            'shallow_forest': shallow_forest
+        }
+        # Only the voting ensemble has a separate LR member to compare against
+        if 'lr' in getattr(self.model, 'named_estimators', {}):
+            models['lr_component'] = clone(self.model.named_estimators['lr']).fit(X_train_vec, y_train)
+        return models
+    
+    def evaluate_serving_models(self, models, X_test, y_test, latency_calls=200):
+        """Accuracy vs single-row latency, batch throughput and artifact size for each candidate"""
+        X_test_vec = self.vectorizer.transform(X_test)
+        single_rows = [X_test_vec[i] for i in range(min(latency_calls, X_test_vec.shape[0]))]
+        reference = self.model.predict(X_test_vec)
+        
+        report = {}
+        for name, model in models.items():
+            y_pred = model.predict(X_test_vec)
+            
+            latencies = []
+            for row in single_rows:
+                start = time.perf_counter()
+                model.predict_proba(row)
+                latencies.append(time.perf_counter() - start)
+            
+            start = time.perf_counter()
+            model.predict_proba(X_test_vec)
+            batch_seconds = time.perf_counter() - start
+            
+            buffer = io.BytesIO()
+            joblib.dump(model, buffer)
+            
+            report[name] = {
+                'f1_macro': f1_score(y_test, y_pred, average='macro'),
+                'accuracy': float(np.mean(y_pred == np.asarray(y_test))),
+                'agreement_with_ensemble': float(np.mean(y_pred == reference)),
+                'single_row_p50_ms': float(np.percentile(latencies, 50) * 1000),
+                'single_row_p99_ms': float(np.percentile(latencies, 99) * 1000),
+                'batch_rows_per_second': X_test_vec.shape[0] / batch_seconds if batch_seconds > 0 else 0.0,
+                'artifact_bytes': buffer.getbuffer().nbytes
+            }
+        
+        return report
+    
+    def export_compact_model(self, serving_model='distilled_linear', path='models/compact/',
+                             report_path='outputs/compact_models.json'):
+        """
+        Build, compare and save a compact serving model next to the full ensemble
+        
+        The chosen candidate is saved with the same vectorizer and categories,
+        so TransactionPredictor(model_path=path) serves it directly.
+        """
+        X_train, X_test, y_train, y_test = self.split
+        
+        print("\n→ Building compact serving models...")
+        models = self.build_compact_models(X_train, y_train)
+        if serving_model not in models:
+            raise ValueError(f"Unknown serving model '{serving_model}'. Choose from: {', '.join(models)}")
+        
+        report = self.evaluate_serving_models(models, X_test, y_test)
+        
+        print(f"\n{'Model':<26} {'F1':>6} {'p50 ms':>8} {'rows/s':>10} {'KB':>8}")
+        for name, row in report.items():
+            print(f"{name:<26} {row['f1_macro']:>6.3f} {row['single_row_p50_ms']:>8.2f} "
+                  f"{row['batch_rows_per_second']:>10.0f} {row['artifact_bytes'] / 1024:>8.0f}")
+        
+        save_artifacts(
+            path, models[serving_model], self.vectorizer, self.categories,
+            extra={'serving_model': serving_model, 'compact_of': type(self.model).__name__,
+                   **self._manifest_extra()}
+        )
+        
+        with open(report_path, 'w') as f:
+            json.dump({'serving_model': serving_model, 'candidates': report,
+                       'timestamp': datetime.now().isoformat()}, f, indent=2)
+        
+        print(f"\n✓ Compact model '{serving_model}' saved to {path}")
+        print(f"✓ Comparison saved to {report_path}")
+        
+        return report
+
+def _vectorize_fold(params, train_texts, val_texts):
+    """Fit one vectorizer setting on a fold's training texts (a search job)"""
+    vectorizer = build_vectorizer(params)
+    X_train = vectorizer.fit_transform(train_texts)
+    return vectorizer, X_train, vectorizer.transform(val_texts)
+
+def _evaluate_fold(vectorizer, X_train, X_val, y_train, y_val, val_texts, kind, params, latency_rows=50):
+    """Fit one candidate on one cached fold and time its inference (a search job)"""
+    # Already one job per core, so the forest builds its trees serially
+    model = build_model(kind, params, n_jobs=1)
+    
+    start = time.perf_counter()
+    model.fit(X_train, y_train)
+    fit_seconds = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    y_pred = model.predict(X_val)
+    batch_seconds = time.perf_counter() - start
+    
+    # Single-row latency includes the TF-IDF transform, as in TransactionPredictor
+    latencies = []
+    for text in val_texts[:latency_rows]:
+        start = time.perf_counter()
+        model.predict_proba(vectorizer.transform([text]))
+        latencies.append(time.perf_counter() - start)
+    
+    return {
+        'f1_macro': f1_score(y_val, y_pred, average='macro'),
+        'fit_seconds': fit_seconds,
+        'single_row_p50_ms': float(np.median(latencies) * 1000),
+        'batch_rows_per_second': X_val.shape[0] / batch_seconds if batch_seconds > 0 else 0.0,
+        'n_features': X_train.shape[1]
+    }
+
+class StreamingCategorizer(TransactionCategorizer):
+    """
+    Out-of-core training for labelled histories larger than memory
+    
+    The CSV is read in chunks and never held in full. A stateless
+    HashingVectorizer replaces the fitted vocabulary, IDF weights are
+    collected in one scan pass, and an SGD logistic regression learns
+    through partial_fit. Every holdout_every-th row is held out for
+    evaluation. The saved vectorizer is a hashing + TF-IDF pipeline, so
+    TransactionPredictor loads the artifacts like any other model.
+    """
+    
+    def __init__(self, n_features=2**18, use_idf=True, chunk_size=50000, holdout_every=10,
+                 alpha=1e-5, random_state=42):
+        # Not super().__init__(): the TF-IDF vectorizer and ensemble it builds are never used here
+        self.categories = []
+        self.feedback_until = None
+        self.chunk_size = chunk_size
+        self.holdout_every = holdout_every
+        self.random_state = random_state
         
-        with open(f'{path}model.pkl', 'wb') as f:
-            pickle.dump(self.model, f)
+        self.hasher = HashingVectorizer(
+            n_features=n_features,
+            ngram_range=(1, 2),
+            alternate_sign=False,
+            norm=None if use_idf else 'l2',
+            lowercase=True
+        )
+        self.idf = TfidfTransformer() if use_idf else None
+        self.vectorizer = make_pipeline(self.hasher, self.idf) if use_idf else self.hasher
+        self.model = SGDClassifier(loss='log_loss', alpha=alpha, random_state=random_state)
+    
+    def preprocess_series(self, texts):
+        """preprocess_text for a whole column using pandas string ops"""
+        return normalize_series(texts)
+    
+    def iter_chunks(self, csv_path, text_column='description', label_column='category'):
+        """Yield (clean texts, labels, holdout mask) per chunk; rows without a label are skipped"""
+        offset = 0
+        reader = pd.read_csv(csv_path, usecols=[text_column, label_column], chunksize=self.chunk_size,
+                             dtype=str, keep_default_na=False)
+        for chunk in reader:
+            positions = np.arange(offset, offset + len(chunk))
+            offset += len(chunk)
+            
+            labelled = (chunk[label_column].str.strip() != '').to_numpy()
+            texts = self.preprocess_series(chunk[text_column]).to_numpy()[labelled]
+            labels = chunk[label_column].to_numpy()[labelled]
+            holdout = positions[labelled] % self.holdout_every == 0
+            yield texts, labels, holdout
+    
+    def scan(self, csv_path, **columns):
+        """First pass: categories, class counts and (with IDF) document frequencies"""
+        n_features = self.hasher.n_features
+        doc_freq = np.zeros(n_features, dtype=np.int64)
+        class_counts = {}
+        n_train = n_holdout = 0
         
-        with open(f'{path}vectorizer.pkl', 'wb') as f:
-            pickle.dump(self.vectorizer, f)
+        for texts, labels, holdout in self.iter_chunks(csv_path, **columns):
+            train_labels = labels[~holdout]
+            for label, count in zip(*np.unique(train_labels, return_counts=True)):
+                class_counts[label] = class_counts.get(label, 0) + int(count)
+            n_train += len(train_labels)
+            n_holdout += int(holdout.sum())
+            
+            if self.idf is not None:
+                X = self.hasher.transform(texts[~holdout])
+                doc_freq += np.bincount(X.indices, minlength=n_features)
+        
+        if n_train == 0:
+            raise ValueError(f"No labelled rows found in {csv_path}")
+        
+        if self.idf is not None:
+            # Same smoothed formula as TfidfTransformer.fit
+            self.idf.idf_ = np.log((1 + n_train) / (1 + doc_freq)) + 1
+        
+        self.categories = sorted(class_counts)
+        # partial_fit can't use class_weight='balanced', so compute it from the scan
+        self.model.set_params(class_weight={
+            label: n_train / (len(class_counts) * count) for label, count in class_counts.items()
+        })
+        
+        return n_train, n_holdout
+    
+    def train_stream(self, csv_path, n_epochs=1, **columns):
+        """Scan, then partial_fit the model chunk by chunk for n_epochs passes"""
+        print("\n=== Training Transaction Categorizer (out-of-core) ===\n")
+        
+        print(f"→ Scanning {csv_path}...")
+        n_train, n_holdout = self.scan(csv_path, **columns)
+        print(f"Categories: {', '.join(self.categories)}")
+        print(f"\nTraining samples: {n_train}")
+        print(f"Holdout samples: {n_holdout}")
+        
+        rng = np.random.default_rng(self.random_state)
+        classes = np.asarray(self.categories, dtype=object)
+        for epoch in range(n_epochs):
+            print(f"→ Epoch {epoch + 1}/{n_epochs}...")
+            for texts, labels, holdout in self.iter_chunks(csv_path, **columns):
+                # Shuffle within the chunk: exports are often sorted by date or category
+                order = rng.permutation(np.flatnonzero(~holdout))
+                if len(order):
+                    self.model.partial_fit(self.vectorizer.transform(texts[order]), labels[order], classes=classes)
+        
+        # Evaluate on the holdout rows, accumulating one confusion matrix
+        cm = np.zeros((len(self.categories), len(self.categories)), dtype=np.int64)
+        for texts, labels, holdout in self.iter_chunks(csv_path, **columns):
+            known = holdout & np.isin(labels, classes)
+            if known.any():
+                y_pred = self.model.predict(self.vectorizer.transform(texts[known]))
+                cm += confusion_matrix(labels[known], y_pred, labels=self.categories)
+        
+        f1_macro, f1_weighted = f1_from_confusion(cm)
+        print("\n=== Model Performance ===\n")
+        print(f"Holdout accuracy: {np.trace(cm) / max(cm.sum(), 1):.3f}")
+        
+        metrics = {
+            'f1_macro': f1_macro,
+            'f1_weighted': f1_weighted,
+            'train_samples': n_train,
+            'test_samples': int(cm.sum()),
+            'categories': self.categories,
+            'mode': 'out_of_core',
+            'epochs': n_epochs,
+            'n_features': self.hasher.n_features,
+            'use_idf': self.idf is not None,
+            'timestamp': datetime.now().isoformat()
+        }
         
-        with open(f'{path}categories.pkl', 'wb') as f:
-            pickle.dump(self.categories, f)
+        self._plot_confusion_matrix(cm, self.categories)
         
-        print(f"\n✓ Model saved to {path}")
+        return metrics
+
+def f1_from_confusion(cm):
+    """Macro and support-weighted F1 from a confusion matrix (rows are true labels)"""
+    cm = np.asarray(cm, dtype=float)
+    tp = np.diag(cm)
+    support = cm.sum(axis=1)
+    predicted = cm.sum(axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        f1 = np.nan_to_num(2 * tp / (support + predicted))
+    weighted = float(np.average(f1, weights=support)) if support.sum() else 0.0
+    return float(f1.mean()), weighted
+
+def load_feedback(path='data/feedback.jsonl'):
+    """
+    Reviewer corrections from the feedback log as training rows
+    
+    Returns (DataFrame with description and category, timestamp of the
+    newest correction). The latest correction per normalized description
+    wins, as it does for the predictor's overrides.
+    """
+    records = FeedbackStore(path).records()
+    if not records:
+        return pd.DataFrame(columns=['description', 'category']), None
+    
+    latest = {normalize_text(record['text']): record for record in records}
+    df = pd.DataFrame(
+        [{'description': record['text'], 'category': record['category']} for record in latest.values()]
+    )
+    return df, max(record['timestamp'] for record in records)
 
 def generate_and_save_config(categories_config, path='config/taxonomy.yaml'):
     """Generate YAML config based on synthetic data definitions"""
@@ -158,77 +619,33 @@ def generate_and_save_config(categories_config, path='config/taxonomy.yaml'):
     
     print(f"✓ Generated taxonomy configuration at {path}")
 
-def generate_synthetic_data(n_samples=1000):
+def generate_synthetic_data(n_samples=1000, seed=None):
     """Generate synthetic transaction data for demonstration"""
-    
-    # Define Categories and associated Keywords/Merchants
-    categories_config = {
-        'Coffee/Dining': [
-            'Starbucks', 'Dunkin Donuts', 'McDonalds', 'Subway', 'Pizza Hut',
-            'KFC', 'Dominos', 'Chipotle', 'Panera Bread', 'Cafe Coffee Day',
-            'Local Restaurant', 'Food Court', 'Dinner', 'Lunch'
-        ],
-        'Fuel': [
-            'Shell Gas', 'Chevron', 'BP Station', 'Exxon', 'Indian Oil',
-            'HP Petrol', 'Bharat Petroleum', 'Gas Station', 'Fuel Stop'
-        ],
-        'Groceries': [
-            'Walmart', 'Target', 'Whole Foods', 'Costco', 'Safeway',
-            'BigBasket', 'DMart', 'Reliance Fresh', 'Supermarket', 'Grocery Store'
-        ],
-        'Shopping': [
-            'Amazon', 'Flipkart', 'Myntra', 'AJIO', 'H&M', 'Zara',
-            'Nike Store', 'Adidas', 'Apple Store', 'Best Buy', 'Mall Purchase'
-        ],
-        'Healthcare': [
-            'Apollo Pharmacy', 'CVS Pharmacy', 'Walgreens', 'Medical Center',
-            'Dental Clinic', 'Hospital', 'Lab Test', 'Doctor Visit'
-        ],
-        'Transportation': [
-            'Uber', 'Lyft', 'Ola Cab', 'Metro Card', 'Bus Pass',
-            'Railway Ticket', 'Parking Fee', 'Toll Plaza'
-        ],
-        'Entertainment': [
-            'Netflix', 'Amazon Prime', 'Spotify', 'Movie Theater',
-            'PVR Cinemas', 'Gaming Store', 'Concert Ticket'
-        ],
-        'Utilities': [
-            'Electric Bill', 'Water Bill', 'Internet Bill', 'Phone Bill',
-            'Gas Bill', 'Airtel', 'Jio', 'Vodafone'
-        ],
-        'Education': [
-            'Coursera', 'Udemy', 'Book Store', 'School Fee',
-            'Tuition Payment', 'Online Course', 'Library'
-        ],
-        'Fitness': [
-            'Gym Membership', 'Yoga Studio', 'Sports Equipment',
-            'Fitness Center', 'Swimming Pool'
-        ]
-    }
-    
-    data = []
-    for category, merchants in categories_config.items():
-        samples_per_category = n_samples // len(categories_config)
-        for _ in range(samples_per_category):
-            merchant = np.random.choice(merchants)
-            # Add some noise
-            noise = ['', ' Downtown', ' Online', ' Store', ' #123', ' - Purchase']
-            description = merchant + np.random.choice(noise)
-            amount = np.random.uniform(5, 500)
-            
-            data.append({
-                'description': description,
-                'amount': round(amount, 2),
-                'category': category
-            })
-    
-    df = pd.DataFrame(data)
-    # Shuffle
-    df = df.sample(frac=1, random_state=42).reset_index(drop=True)
-    
-    return df, categories_config
+    # Equal category counts and the simple demo noise, drawn in one vectorized pass
+    df = generate_transactions(n_samples, seed=seed, realistic_noise=False)
+    return df, CATEGORIES_CONFIG
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="AI Transaction Categorizer - training pipeline")
+    parser.add_argument('--compact', action='store_true', help="Also export a compact serving model to models/compact/")
+    parser.add_argument('--serving-model', default='distilled_linear',
+                        help="Compact candidate to save: distilled_linear, distilled_linear_float32, lr_component, shallow_forest")
+    parser.add_argument('--search', action='store_true',
+                        help="Run a parallel CV search first and train the best configuration")
+    parser.add_argument('--cv', type=int, default=5, help="Folds for --search")
+    parser.add_argument('--n-jobs', type=int, default=-1, help="Parallel jobs for --search (-1 = all cores)")
+    parser.add_argument('--stream', metavar='CSV',
+                        help="Train out-of-core on a labelled CSV (description, category) instead of synthetic data")
+    parser.add_argument('--chunk-size', type=int, default=50000, help="Rows per chunk for --stream")
+    parser.add_argument('--epochs', type=int, default=1, help="Passes over the CSV for --stream")
+    parser.add_argument('--n-features', type=int, default=2**18, help="Hashed feature space size for --stream")
+    parser.add_argument('--no-idf', action='store_true', help="Skip the IDF scan for --stream")
+    parser.add_argument('--feedback', default='data/feedback.jsonl',
+                        help="Reviewer corrections to add to the training data ('' to skip)")
+    args = parser.parse_args()
+    if args.stream and (args.compact or args.search):
+        parser.error("--stream trains a single SGD model; it can't be combined with --compact or --search")
+    
     # Create directories
     os.makedirs('models', exist_ok=True)
     os.makedirs('outputs', exist_ok=True)
@@ -239,34 +656,73 @@ if __name__ == "__main__":
     print("AI TRANSACTION CATEGORIZER - TRAINING PIPELINE")
     print("=" * 60)
     
-    # Generate synthetic data
-    print("\n→ Generating synthetic transaction data...")
-    df, cat_config = generate_synthetic_data(n_samples=1000)
-    df.to_csv('data/synthetic_transactions.csv', index=False)
-    print(f"✓ Generated {len(df)} transactions")
-    print(f"✓ Saved to data/synthetic_transactions.csv")
-    
-    # Generate taxonomy.yaml based on the data generation rules
-    # This ensures the Rule Engine matches the Training Data
-    generate_and_save_config(cat_config)
-    
-    # Initialize and train
-    categorizer = TransactionCategorizer()
-    
-    metrics, X_test, y_test, y_pred = categorizer.train(df)
-    
-    # Save model
-    categorizer.save_model()
-    
-    # Save metrics
-    with open('outputs/metrics.json', 'w') as f:
-        json.dump(metrics, f, indent=2)
-    
-    print("\n" + "=" * 60)
-    print("✓ TRAINING COMPLETE!")
-    print("=" * 60)
-    print(f"\nMacro F1 Score: {metrics['f1_macro']:.3f}")
-    print(f"Weighted F1 Score: {metrics['f1_weighted']:.3f}")
-    print("\nNext steps:")
-    print("1. Run 'streamlit run app.py' to test the demo")
-    print("2. Check outputs/ folder for metrics and visualizations")
\ No newline at end of file
+    if args.stream:
+        # Out-of-core mode keeps the existing taxonomy.yaml untouched
+        categorizer = StreamingCategorizer(
+            n_features=args.n_features,
+            use_idf=not args.no_idf,
+            chunk_size=args.chunk_size
+        )
+        metrics = categorizer.train_stream(args.stream, n_epochs=args.epochs)
+        categorizer.save_model()
+        
+        with open('outputs/metrics.json', 'w') as f:
+            json.dump(metrics, f, indent=2)
+        
+        print("\n" + "=" * 60)
+        print("✓ TRAINING COMPLETE!")
+        print("=" * 60)
+        print(f"\nMacro F1 Score: {metrics['f1_macro']:.3f}")
+        print(f"Weighted F1 Score: {metrics['f1_weighted']:.3f}")
+        print("\nNext steps:")
+        print("1. Run 'python predict.py' or 'streamlit run app.py' with the new model")
+        print("2. Check outputs/ folder for metrics and visualizations")
+    else:
+        # Generate synthetic data
+        print("\n→ Generating synthetic transaction data...")
+        df, cat_config = generate_synthetic_data(n_samples=1000)
+        df.to_csv('data/synthetic_transactions.csv', index=False)
+        print(f"✓ Generated {len(df)} transactions")
+        print(f"✓ Saved to data/synthetic_transactions.csv")
+        
+        # Generate taxonomy.yaml based on the data generation rules
+        # This ensures the Rule Engine matches the Training Data
+        generate_and_save_config(cat_config)
+        
+        # Initialize and train
+        categorizer = TransactionCategorizer()
+        
+        if args.search:
+            leaderboard = categorizer.search(df, cv=args.cv, n_jobs=args.n_jobs)
+            best = leaderboard.iloc[0]
+            print(f"\n✓ Best: {best['model']} {best['model_params']} with vectorizer {best['vectorizer']}")
+            vectorizer_params = json.loads(best['vectorizer'])
+            if 'ngram_range' in vectorizer_params:
+                vectorizer_params['ngram_range'] = tuple(vectorizer_params['ngram_range'])
+            categorizer = TransactionCategorizer(
+                vectorizer_params=vectorizer_params,
+                model_kind=best['model'],
+                model_params=json.loads(best['model_params'])
+            )
+        
+        feedback = load_feedback(args.feedback) if args.feedback else None
+        metrics, X_test, y_test, y_pred = categorizer.train(df, feedback=feedback)
+        
+        # Save model
+        categorizer.save_model()
+        
+        # Save metrics
+        with open('outputs/metrics.json', 'w') as f:
+            json.dump(metrics, f, indent=2)
+        
+        if args.compact:
+            categorizer.export_compact_model(serving_model=args.serving_model)
+        
+        print("\n" + "=" * 60)
+        print("✓ TRAINING COMPLETE!")
+        print("=" * 60)
+        print(f"\nMacro F1 Score: {metrics['f1_macro']:.3f}")
+        print(f"Weighted F1 Score: {metrics['f1_weighted']:.3f}")
+        print("\nNext steps:")
+        print("1. Run 'streamlit run app.py' to test the demo")
+        print("2. Check outputs/ folder for metrics and visualizations")
\ No newline at end of file